@@ -18,6 +18,8 @@ if TYPE_CHECKING:
 class Base:
     bot: Morpheus
     config = config
+    # gateway intents the cog needs, bot is started with union of intents of loaded cogs
+    intents = discord.Intents.none()
 
     def __init__(self):
         self.tasks = []
@@ -16,6 +16,8 @@ if TYPE_CHECKING:
 
 
 class Bookmark(Base, commands.Cog):
+    intents = discord.Intents(guild_reactions=True, message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from typing import TYPE_CHECKING
 
 import discord
 
+from config.app_config import config
 from utils.constants import MAX_FILE_SIZE
-from utils.general import split_to_parts
+from utils.general import cut_string_by_words, split_to_parts
+from utils.message_cache import message_cache
 
 from .messages import BookmarkMess
 
@@ -14,6 +17,69 @@ if TYPE_CHECKING:
     from morpheus import Morpheus
 
 
+# files of one bookmark are sent in one DM, together they must fit the upload limit
+DOWNLOAD_BUDGET = MAX_FILE_SIZE
+
+# downloads of all bookmarks at once, bursts of bookmarks don't open unbounded number of requests
+download_semaphore = asyncio.Semaphore(config.bookmark_download_concurrency)
+
+
+def is_image(attachment: discord.Attachment) -> bool:
+    return bool(re.search(r"\.png|\.jpg|\.jpeg|\.gif$", str(attachment)))
+
+
+async def download(item: discord.Attachment | discord.StickerItem) -> discord.File:
+    async with download_semaphore:
+        return await item.to_file()
+
+
+async def download_files(
+    attachments: list[discord.Attachment], stickers: list[discord.StickerItem]
+) -> tuple[list[discord.File], list[discord.Attachment | discord.StickerItem]]:
+    """Download stickers and attachments concurrently.
+
+    Size of a sticker is known only after its download, so stickers are downloaded first. Smallest
+    attachments are downloaded then until the rest of `DOWNLOAD_BUDGET` is used. Items over the budget
+    or attachments failed to download are returned to be forwarded by URL.
+    """
+    budget = DOWNLOAD_BUDGET
+    files = []
+    linked = []
+    results = await asyncio.gather(*(download(sticker) for sticker in stickers), return_exceptions=True)
+    for sticker, result in zip(stickers, results):
+        if isinstance(result, discord.DiscordException):
+            # e.g. sticker in lottie format
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        size = len(result.fp.getbuffer())
+        if size <= budget:
+            files.append(result)
+            budget -= size
+        else:
+            result.close()
+            linked.append(sticker)
+
+    selected = set()
+    for attachment in sorted(attachments, key=lambda attachment: attachment.size):
+        if attachment.size <= budget:
+            selected.add(attachment.id)
+            budget -= attachment.size
+
+    to_download = [attachment for attachment in attachments if attachment.id in selected]
+    linked += [attachment for attachment in attachments if attachment.id not in selected]
+    results = await asyncio.gather(*(download(attachment) for attachment in to_download), return_exceptions=True)
+    for attachment, result in zip(to_download, results):
+        if isinstance(result, discord.DiscordException):
+            # e.g. deleted attachment
+            linked.append(attachment)
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        files.append(result)
+    return files, linked
+
+
 class BookmarkFeatures:
     def __init__(self, bot):
         self.bot = bot
@@ -51,28 +117,21 @@ class BookmarkFeatures:
         else:
             content += "*Empty*"
 
-        # create list of attachments
-        upload_limit = False
+        # images are embedded by URL, other files are downloaded at once or linked over the upload limit
         images = []
-        files_attached = []
-        if ctx.message.attachments:
-            for attachment in ctx.message.attachments:
-                if attachment.size > MAX_FILE_SIZE:  # max size bot is able to send to dm
-                    upload_limit = True
-                    continue
-                if re.search(r"\.png|\.jpg|\.jpeg|\.gif$", str(attachment)):
-                    images.append(attachment)
-                else:
-                    files_attached.append(await attachment.to_file())
+        downloads = []
+        for attachment in ctx.message.attachments:
+            if is_image(attachment):
+                images.append(attachment)
+            else:
+                downloads.append(attachment)
+
+        files_attached, linked = await download_files(downloads, ctx.message.stickers)
 
         if images:
             embed.set_image(images[0])
             del images[0]
 
-        if ctx.message.stickers:
-            for sticker in ctx.message.stickers:
-                files_attached.append(await sticker.to_file())
-
         if len(content) > 1024:
             parts = split_to_parts(content, 1024)
             for msg in parts:
@@ -80,7 +139,9 @@ class BookmarkFeatures:
         else:
             embed.add_field(name="Původní zpráva", value=content, inline=False)
 
-        if upload_limit:
+        if linked:
+            links = "\n".join(f"[{getattr(item, 'filename', item.name)}]({item.url})" for item in linked)
+            embed.add_field(name="Přílohy", value=cut_string_by_words(links, 1024, "\n")[0], inline=False)
             embed.add_field(name="Poznámka", value=BookmarkMess.bookmark_upload_limit, inline=False)
         embed.add_field(name="Channel", value=f"{ctx.message.channel.mention} - #{ctx.message.channel}")
         return ([embed], images, files_attached)
@@ -129,5 +190,5 @@ class BookmarkContext:
         This method fetches the channel, message, and guild associated with the bookmarked message.
         """
         self.channel = self.bot.get_channel(self.channel_id)
-        self.message = await self.channel.fetch_message(self.message_id)
+        self.message = await message_cache.fetch(self.channel, self.message_id)
         self.guild = self.bot.get_guild(self.guild_id)
@@ -14,6 +14,7 @@ from custom import custom_errors
 from custom.enums import DiscordTimestamps
 from utils.general import cut_string
 from utils.interaction import custom_send
+from utils.message_cache import message_cache
 
 from .messages import ErrorMess
 
@@ -22,6 +23,8 @@ if TYPE_CHECKING:
 
 
 class Error(Base, commands.Cog):
+    intents = discord.Intents(message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
@@ -164,7 +167,7 @@ class Error(Base, commands.Cog):
                 guild = self.bot.get_guild(arg.guild_id)
                 event_guild = guild.name
                 channel = guild.get_channel(arg.channel_id)
-                message = await channel.fetch_message(arg.message_id)
+                message = await message_cache.fetch(channel, arg.message_id)
                 message = message.content[:1000]
             else:
                 event_guild = "DM"
@@ -176,7 +179,7 @@ class Error(Base, commands.Cog):
             else:
                 channel = self.bot.get_channel(arg.channel_id)
                 if channel:
-                    message = await channel.fetch_message(arg.message_id)
+                    message = await message_cache.fetch(channel, arg.message_id)
                     if message.content:
                         message = message.content[:1000]
                     elif message.embeds:
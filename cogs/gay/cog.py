@@ -49,6 +49,8 @@ async def iterate_messages(channel):
 
 
 class Gay(Base, commands.Cog):
+    intents = discord.Intents(message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
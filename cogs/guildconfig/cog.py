@@ -10,7 +10,8 @@ from discord.ext import commands
 
 from cogs.base import Base
 from custom.cooldowns import default_cooldown
-from database.guild import GuildDB, GuildPhraseDB
+from database.database import database
+from database.guild import AttachmentBlobDB, GuildDB, GuildPhraseDB
 from utils.general import cut_string_by_words
 
 from .messages import GuildConfigMess
@@ -35,18 +36,44 @@ class ReplyGroup(app_commands.Group):
 
 
 class GuildConfig(Base, commands.Cog):
+    intents = discord.Intents(guild_messages=True, message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
         self.phrases = {}
 
+    async def load_guilds(self, guilds: list[discord.Guild]):
+        """Makes sure guilds exist in db and loads their phrases.
+
+        Uses one insert and one select for all guilds in one transaction, safe to run again on every ready event.
+        """
+        guild_ids = [str(guild.id) for guild in guilds]
+        if not guild_ids:
+            return
+
+        async with database.unit_of_work():
+            await GuildDB.add_missing_guilds(guild_ids)
+            phrases = await GuildDB.get_phrases_by_guilds(guild_ids)
+        for guild_id, guild_phrases in phrases.items():
+            self.phrases[int(guild_id)] = guild_phrases
+
+    async def reload_phrases(self, guild_id: int):
+        phrases = await GuildDB.get_phrases_by_guilds([str(guild_id)])
+        self.phrases[guild_id] = phrases[str(guild_id)]
+
     @commands.Cog.listener()
     async def on_ready(self):
-        for guild in self.bot.guilds:
-            guild_db = await GuildDB.get_guild(str(guild.id))
-            if not guild_db:
-                guild_db = await GuildDB.add_guild(str(guild.id))
-            self.phrases[guild.id] = guild_db.phrases_dict
+        await self.load_guilds(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_shard_ready(self, shard_id: int):
+        """Shards reconnect independently when sharded, reload only guilds of the shard"""
+        await self.load_guilds([guild for guild in self.bot.guilds if guild.shard_id == shard_id])
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await self.load_guilds([guild])
 
     reply_group = ReplyGroup(name="reply", description="Autoreply commands")
 
@@ -56,8 +83,7 @@ class GuildConfig(Base, commands.Cog):
     @app_commands.command(name="edit_config", description=GuildConfigMess.edit_config_brief)
     async def edit_config(self, inter: discord.Interaction, info_channel: discord.TextChannel):
         """for now only info channel in future all attributes guild config can have"""
-        guild_db = await GuildDB.get_guild(str(inter.guild.id))
-        await guild_db.set_info_channel(info_channel.id)
+        await GuildDB.set_info_channel(str(inter.guild.id), str(info_channel.id))
         await inter.response.send_message(GuildConfigMess.info_channel_set(info_channel=info_channel.mention))
 
     @commands.Cog.listener("on_message")
@@ -88,8 +114,13 @@ class GuildConfig(Base, commands.Cog):
             return
 
         # Send reply with or without attachment
-        if phrase_obj.attachment_data and phrase_obj.attachment_filename:
-            file = discord.File(io.BytesIO(phrase_obj.attachment_data), filename=phrase_obj.attachment_filename)
+        attachment_data = None
+        if phrase_obj.attachment_hash and phrase_obj.attachment_filename:
+            attachment_data = await AttachmentBlobDB.get_data(phrase_obj.attachment_hash)
+
+        if attachment_data:
+            # BytesIO shares the cached bytes until written to, no copy per message
+            file = discord.File(io.BytesIO(attachment_data), filename=phrase_obj.attachment_filename)
             await message.channel.send(phrase_obj.value, file=file)
         else:
             await message.channel.send(phrase_obj.value)
@@ -123,8 +154,7 @@ class GuildConfig(Base, commands.Cog):
             await inter.response.send_message(GuildConfigMess.reply_exists(key=key))
             return
 
-        guild_db = await GuildDB.get_guild(str(inter.guild.id))
-        self.phrases[inter.guild.id] = guild_db.phrases_dict
+        await self.reload_phrases(inter.guild.id)
         await inter.response.send_message(GuildConfigMess.reply_added(key=key))
 
     @reply_group.command(name="remove", description=GuildConfigMess.rem_reply_brief)
@@ -135,8 +165,7 @@ class GuildConfig(Base, commands.Cog):
             await inter.response.send_message(GuildConfigMess.reply_not_found(key=key))
             return
 
-        guild_db = await GuildDB.get_guild(str(inter.guild.id))
-        self.phrases[inter.guild.id] = guild_db.phrases_dict
+        await self.reload_phrases(inter.guild.id)
         await inter.response.send_message(GuildConfigMess.reply_removed(key=key))
 
     @reply_group.command(name="list", description=GuildConfigMess.list_reply_brief)
@@ -150,7 +179,7 @@ class GuildConfig(Base, commands.Cog):
         pink_c = "\u001b[2;35m"
         default_c = "\u001b[0m"
         replies_list = [
-            f"{blue_c}{key}{(' (+ attachment)' if phrase_obj.attachment_data else '')}{default_c}: {pink_c}{phrase_obj.value}{default_c}\n"
+            f"{blue_c}{key}{(' (+ attachment)' if phrase_obj.attachment_hash else '')}{default_c}: {pink_c}{phrase_obj.value}{default_c}\n"
             for key, phrase_obj in phrases.items()
         ]
         replies_str = "".join(replies_list)
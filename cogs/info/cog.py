@@ -20,6 +20,9 @@ if TYPE_CHECKING:
 
 
 class Info(Base, commands.Cog):
+    # presences are not requested, status is shown only when they are enabled in config
+    intents = discord.Intents(members=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
@@ -37,7 +40,7 @@ class Info(Base, commands.Cog):
     @app_commands.command(name="user_info", description=InfoMess.user_info_brief)
     async def user_info(self, inter: discord.Interaction, user: discord.Member = None):
         user = user or inter.user
-        user = inter.guild.get_member(user.id)
+        user = inter.guild.get_member(user.id) or user
         style = DiscordTimestamps.ShortDateTime.value
 
         embed = discord.Embed(title=f"{user.display_name} ({user.name})", color=user.color)
@@ -46,7 +49,8 @@ class Info(Base, commands.Cog):
         if user.avatar is not None:
             embed.set_thumbnail(url=user.avatar)
 
-        embed.add_field(name="Status", value=str(user.status).title(), inline=True)
+        if self.bot.intents.presences:
+            embed.add_field(name="Status", value=str(user.status).title(), inline=True)
         embed.add_field(name="ID", value=str(user.id), inline=True)
 
         if user.roles[1:]:
@@ -15,6 +15,8 @@ if TYPE_CHECKING:
 class Instagram(Base, commands.Cog):
     """Cog for handling Instagram URL embeds."""
 
+    intents = discord.Intents(guild_messages=True, message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
@@ -20,6 +20,8 @@ PNG_HEADER = b"\x89PNG\r\n\x1a\n"
 
 
 class Latex(Base, commands.Cog):
+    intents = discord.Intents(guild_messages=True, dm_messages=True, message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from .archiver import log_archiver
 from .cog import Logger
 from .levels import LoggerLeveles
+from .search_index import log_indexer
 from .top_logger import top_logger
+from .writer import log_writer
 
 if TYPE_CHECKING:
     from morpheus import Morpheus
@@ -12,8 +15,16 @@ if TYPE_CHECKING:
 
 async def setup(bot: Morpheus):
     LoggerLeveles.add_level_names()
+    log_archiver.on_delete = log_indexer.prune_archive
+    log_archiver.start()
+    log_writer.start()
+    log_indexer.start()
     await bot.add_cog(Logger(bot))
 
 
 def teardown(_):
+    # write queued records before their file handlers are closed
+    log_writer.stop()
+    log_archiver.stop()
+    log_indexer.stop()
     top_logger.guild_loggers.clear()
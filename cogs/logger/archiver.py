@@ -0,0 +1,122 @@
+"""
+Compression of rotated guild logs and retention of archives by total size.
+"""
+
+from __future__ import annotations
+
+import glob
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+from typing import Callable
+
+from config.app_config import config
+
+LOGS_DIR = "logs"
+
+# rotated files are named current.<date>.<ext> by `namer` of the guild logger
+ROTATED_PATTERN = f"{LOGS_DIR}/*/*/current.*.*"
+ARCHIVE_PATTERN = f"{LOGS_DIR}/*/*/*.gz"
+# files of the plain text format from before, they are never written again
+LEGACY_CURRENT_PATTERN = f"{LOGS_DIR}/*/*/current.log"
+
+
+class LogArchiver:
+    """Thread compressing rotated logs, so rotation in the writer thread is only a rename.
+
+    After the queue of rotated files is empty, the oldest archives of all guilds are
+    deleted until they fit into `logger.retention_size_mb`.
+    """
+
+    def __init__(self):
+        self.queue: queue.Queue[str | None] = queue.Queue()
+        self.thread: threading.Thread | None = None
+        self.compressed = 0
+        self.deleted = 0
+        self.archive_size = 0
+        # called with the path of every archive deleted by retention, e.g. to prune the search index
+        self.on_delete: Callable[[str], None] | None = None
+
+    def rotator(self, source: str, dest: str) -> None:
+        """Rotator of file handlers, called by the writer thread when the day changes"""
+        if os.path.exists(source):
+            os.rename(source, dest)
+            self.queue.put(dest)
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name="log_archiver", daemon=True)
+        self.thread.start()
+        self.queue_leftovers()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def queue_leftovers(self) -> None:
+        """Queue rotated files which were not compressed before the last shutdown"""
+        for path in glob.glob(LEGACY_CURRENT_PATTERN):
+            date = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+            self.rotator(path, path.replace("current.log", f"current.{date}.log"))
+
+        for path in glob.glob(ROTATED_PATTERN):
+            if path.endswith((".jsonl", ".log")):
+                self.queue.put(path)
+
+    def _run(self) -> None:
+        while True:
+            path = self.queue.get()
+            if path is None:
+                return
+
+            try:
+                self.compress(path)
+            except OSError as e:
+                logging.warning(f"Failed to compress log {path}: {e!r}")
+
+            if self.queue.empty():
+                try:
+                    self.enforce_retention()
+                except OSError as e:
+                    logging.warning(f"Failed to enforce log retention: {e!r}")
+
+    def compress(self, path: str) -> None:
+        tmp_path = f"{path}.gz.tmp"
+        with open(path, "rb") as source, gzip.open(tmp_path, "wb", compresslevel=config.logger_compress_level) as dest:
+            shutil.copyfileobj(source, dest)
+        # archive keeps time of the last record, retention deletes by it
+        stat = os.stat(path)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, f"{path}.gz")
+        os.remove(path)
+        self.compressed += 1
+
+    def enforce_retention(self) -> None:
+        """Delete oldest archives until archives of all guilds fit into the size limit"""
+        archives = []
+        for path in glob.glob(ARCHIVE_PATTERN):
+            stat = os.stat(path)
+            archives.append((stat.st_mtime, stat.st_size, path))
+
+        limit = config.logger_retention_size_mb * 1024 * 1024
+        total = sum(size for _, size, _ in archives)
+        for _, size, path in sorted(archives):
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+            self.deleted += 1
+            if self.on_delete is not None:
+                self.on_delete(path)
+        self.archive_size = total
+
+
+log_archiver = LogArchiver()
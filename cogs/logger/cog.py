@@ -1,28 +1,136 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import TYPE_CHECKING
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 
 from cogs.base import Base
+from custom.permission_check import is_bot_admin
 
+from . import features
 from .levels import LoggerLeveles
+from .message_store import message_store
+from .messages import LoggerMess
+from .search_index import log_indexer, search
 from .top_logger import top_logger
+from .writer import log_writer
 
 if TYPE_CHECKING:
     from morpheus import Morpheus
 
 
 class Logger(Base, commands.Cog):
+    intents = discord.Intents(guild_messages=True, guild_reactions=True, message_content=True, members=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
 
+    @app_commands.check(is_bot_admin)
+    @app_commands.command(name="log_stats", description=LoggerMess.log_stats_brief)
+    async def log_stats(self, inter: discord.Interaction):
+        embed = discord.Embed(title=LoggerMess.log_stats_title, colour=discord.Color.yellow())
+        for name, value in log_writer.stats.as_dict().items():
+            embed.add_field(name=name.replace("_", " ").capitalize(), value=value)
+        embed.add_field(name="Queued", value=f"{log_writer.queue.qsize()} / {log_writer.queue.maxsize}")
+        embed.add_field(name="Writer", value="running" if log_writer.running else "stopped")
+        embed.add_field(name="Open files", value=f"{len(log_writer.pool)} / {log_writer.pool.max_open}")
+        embed.add_field(name="File evictions", value=log_writer.pool.evictions)
+        embed.add_field(name="Stored messages", value=len(message_store))
+        embed.add_field(
+            name="Store size", value=f"{message_store.size // 1024} / {message_store.max_bytes // 1024} KiB"
+        )
+        embed.add_field(name="Indexed", value=log_indexer.indexed)
+        embed.add_field(name="Index dropped", value=log_indexer.dropped)
+        embed.add_field(name="Index pruned", value=log_indexer.pruned)
+        embed.add_field(name="Open indexes", value=f"{len(log_indexer.pool)} / {log_indexer.pool.max_open}")
+        await inter.response.send_message(embed=embed)
+
+    @app_commands.check(is_bot_admin)
+    @app_commands.command(name="log_search", description=LoggerMess.log_search_brief)
+    @app_commands.describe(
+        text=LoggerMess.log_search_text_param,
+        since=LoggerMess.log_search_date_param,
+        until=LoggerMess.log_search_date_param,
+    )
+    @app_commands.choices(
+        event=[
+            app_commands.Choice(name=name.capitalize(), value=name)
+            for name in ("message", "edit", "delete", "reaction", "command")
+        ]
+    )
+    async def log_search(
+        self,
+        inter: discord.Interaction,
+        text: str = None,
+        author: discord.User = None,
+        channel: discord.abc.GuildChannel = None,
+        event: app_commands.Choice[str] = None,
+        since: str = None,
+        until: str = None,
+    ):
+        try:
+            start, end = features.date_range(since, until)
+        except ValueError:
+            await inter.response.send_message(LoggerMess.log_search_invalid_date, ephemeral=True)
+            return
+
+        # results can contain content of deleted messages
+        await inter.response.defer(ephemeral=True)
+        rows = await asyncio.to_thread(
+            search,
+            inter.guild_id,
+            features.RESULTS_LIMIT,
+            text=text,
+            author_id=author.id if author else None,
+            channel_id=channel.id if channel else None,
+            event=event.value if event else None,
+            since=start,
+            until=end,
+        )
+        if not rows:
+            await inter.edit_original_response(content=LoggerMess.log_search_no_results)
+            return
+
+        embeds, view = features.create_search_embeds(inter.guild_id, rows, inter.user)
+        await inter.edit_original_response(embed=embeds[0], view=view)
+        view.message = await inter.original_response()
+
+    @staticmethod
+    def log_event(logger: logging.Logger, level: int, guild_id: int, fields: dict) -> None:
+        """Write event to the guild log and queue it for the search index"""
+        logger.log(level, fields)
+        log_indexer.add(guild_id, logging.getLevelName(level).lower(), fields)
+
     @staticmethod
-    def log_prefix(channel: discord.abc.GuildChannel, message: str, author: discord.User) -> str:
-        author = f"{author.display_name}({author.id})" if author else "Unknown Author"
-        return f"Channel: {channel}, Message: {message}, Author: {author}"
+    def event_fields(
+        channel: discord.abc.GuildChannel | discord.Thread | int | None,
+        message_id: int | None,
+        author: discord.abc.User | int | None,
+    ) -> dict:
+        """Common fields of logged events, uncached channels and authors are logged by their ID"""
+        fields = {"channel_id": channel, "channel": None, "message_id": message_id, "author_id": author, "author": None}
+        if channel is not None and not isinstance(channel, int):
+            fields["channel_id"], fields["channel"] = channel.id, str(channel)
+        if author is not None and not isinstance(author, int):
+            fields["author_id"], fields["author"] = author.id, author.display_name
+        return fields
+
+    @staticmethod
+    def content_fields(message: discord.Message) -> dict:
+        attachments = []
+        if "Traceback" not in message.content:
+            attachments = [attachment.url for attachment in message.attachments]
+
+        return {
+            "content": message.content,
+            "embeds": [embed.to_dict() for embed in message.embeds],
+            "attachments": attachments,
+        }
 
     @commands.Cog.listener("on_message")
     async def on_message_log(self, message: discord.Message):
@@ -32,105 +140,84 @@ class Logger(Base, commands.Cog):
         if message.guild is None:
             return
 
-        if message.embeds:
-            for embed in message.embeds:
-                content = embed.to_dict()
-        else:
-            content = message.content
-
-        attachments = []
-        if "Traceback" not in message.content:
-            if message.attachments:
-                for x in message.attachments:
-                    attachments.append(x.url)
-
-        prefix = self.log_prefix(message.channel, message.jump_url, message.author)
+        fields = self.event_fields(message.channel, message.id, message.author) | self.content_fields(message)
+        message_store.add(message.id, message.author.id, message.channel.id, message.content, fields["attachments"])
         logger = top_logger.get_guild_logger(message.guild.id)
-        logger.message_logger.log(LoggerLeveles.Message, f"{prefix}, Content: {content}, Attachments: {attachments}")
+        self.log_event(logger.message_logger, LoggerLeveles.Message, message.guild.id, fields)
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if self.bot.user.id == payload.user_id:
+    def log_reaction(self, payload: discord.RawReactionActionEvent, action: str) -> None:
+        """Log reaction from payload and cache alone, reactions don't fetch the message"""
+        if payload.guild_id is None or self.bot.user.id == payload.user_id:
             return
 
-        channel = self.bot.get_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
+        channel = self.bot.get_channel(payload.channel_id) or payload.channel_id
         guild = self.bot.get_guild(payload.guild_id)
-        author = guild.get_member(payload.user_id)
+        author = payload.member or (guild.get_member(payload.user_id) if guild else None) or payload.user_id
 
-        prefix = self.log_prefix(channel, message.jump_url, author)
+        fields = self.event_fields(channel, payload.message_id, author)
+        fields |= {"action": action, "emoji": str(payload.emoji)}
         logger = top_logger.get_guild_logger(payload.guild_id)
-        logger.reaction_logger.log(LoggerLeveles.Reaction, f"{prefix}, Remove: {payload.emoji}")
+        self.log_event(logger.reaction_logger, LoggerLeveles.Reaction, payload.guild_id, fields)
 
     @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if self.bot.user.id == payload.user_id:
-            return
-
-        channel = self.bot.get_channel(payload.channel_id)
-        message = await channel.fetch_message(payload.message_id)
-        guild = self.bot.get_guild(payload.guild_id)
-        author = guild.get_member(payload.user_id)
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        self.log_reaction(payload, "remove")
 
-        prefix = self.log_prefix(channel, message.jump_url, author)
-        logger = top_logger.get_guild_logger(payload.guild_id)
-        logger.reaction_logger.log(LoggerLeveles.Reaction, f"{prefix}, Add: {payload.emoji}")
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        self.log_reaction(payload, "add")
 
     @commands.Cog.listener()
     async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
-        if payload.cached_message:
-            message = payload.cached_message
-            channel = message.channel
-        else:
-            channel = self.bot.get_channel(payload.channel_id)
-            message = await channel.fetch_message(payload.message_id)
+        # edit payload carries the new content, updates without it (e.g. embeds) don't change content
+        author_data = payload.data.get("author")
+        if payload.guild_id is None or author_data is None or "content" not in payload.data:
+            return
 
-        if message.author.bot:
+        if author_data.get("bot"):
             return
 
-        prefix = self.log_prefix(channel, message.jump_url, message.author)
+        channel = self.bot.get_channel(payload.channel_id) or payload.channel_id
+        guild = self.bot.get_guild(payload.guild_id)
+        author_id = int(author_data["id"])
+        member = guild.get_member(author_id) if guild else None
+
+        fields = self.event_fields(channel, payload.message_id, member or author_id)
+        if member is None:
+            fields["author"] = author_data.get("global_name") or author_data.get("username")
+        fields["content"] = payload.data["content"]
+        message_store.update_content(payload.message_id, payload.data["content"])
         logger = top_logger.get_guild_logger(payload.guild_id)
-        logger.message_logger.log(LoggerLeveles.Edit, f"{prefix}, Content: {message.content}")
+        self.log_event(logger.message_logger, LoggerLeveles.Edit, payload.guild_id, fields)
 
     @commands.Cog.listener()
     async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
-        if payload.cached_message:
-            message = payload.cached_message
-            author = message.author
-        else:
-            author = None
-            message = None
+        if payload.guild_id is None:
+            return
 
-        if author and author.id == self.bot.user.id:
+        stored = message_store.pop(payload.message_id)
+        message = payload.cached_message
+        if message and message.author.id == self.bot.user.id:
             return
 
+        channel = self.bot.get_channel(payload.channel_id) or payload.channel_id
         if message:
-            if message.embeds:
-                for embed in message.embeds:
-                    content = embed.to_dict()
-            else:
-                content = message.content
-
-            attachments = []
-            if "Traceback" not in message.content:
-                if message.attachments:
-                    for x in message.attachments:
-                        attachments.append(x.url)
+            fields = self.event_fields(channel, payload.message_id, message.author)
+            fields |= self.content_fields(message)
+        elif stored:
+            # message is no longer in the message cache of discord.py, content is from the logger store
+            guild = self.bot.get_guild(payload.guild_id)
+            author = (guild.get_member(stored.author_id) if guild else None) or stored.author_id
+            fields = self.event_fields(channel, payload.message_id, author)
+            fields |= {"content": stored.content, "embeds": [], "attachments": list(stored.attachments)}
         else:
-            content = ""
-            attachments = ""
-
-        channel = self.bot.get_channel(payload.channel_id)
-
-        prefix = self.log_prefix(channel, payload.message_id, author)
+            fields = self.event_fields(channel, payload.message_id, None)
         logger = top_logger.get_guild_logger(payload.guild_id)
-        logger.message_logger.log(LoggerLeveles.Delete, f"{prefix}, Content: {content}, Attachments: {attachments}")
+        self.log_event(logger.message_logger, LoggerLeveles.Delete, payload.guild_id, fields)
 
     @commands.Cog.listener()
-    async def on_command(self, inter: discord.Interaction):
-        prefix = self.log_prefix(inter.channel, inter.message.jump_url, inter.user)
-        logger = top_logger.get_guild_logger(inter.guild.id)
-        logger.command_logger.log(
-            LoggerLeveles.Command,
-            f"{prefix}, Command: {inter.prefix}{inter.command.name}, Passed: {inter.kwargs}",
-        )
+    async def on_command(self, ctx: commands.Context):
+        fields = self.event_fields(ctx.channel, ctx.message.id, ctx.author)
+        fields |= {"command": f"{ctx.prefix}{ctx.command.name}", "arguments": ctx.kwargs}
+        logger = top_logger.get_guild_logger(ctx.guild.id)
+        self.log_event(logger.command_logger, LoggerLeveles.Command, ctx.guild.id, fields)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from utils.embed import PaginationView
+from utils.general import message_jump_url
+
+from .messages import LoggerMess
+
+RESULTS_LIMIT = 200
+RESULTS_PER_PAGE = 10
+CONTENT_PREVIEW = 150
+
+
+def parse_date(date: str) -> float:
+    """Timestamp of the start of the day in UTC, raises ValueError for other formats than YYYY-MM-DD"""
+    return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def date_range(since: str | None, until: str | None) -> tuple[float | None, float | None]:
+    """Timestamps of the range, `until` day is included"""
+    start = parse_date(since) if since else None
+    end = parse_date(until) + timedelta(days=1).total_seconds() if until else None
+    return start, end
+
+
+def result_line(guild_id: int, row: sqlite3.Row) -> str:
+    content = discord.utils.escape_markdown(row["content"] or "")
+    if len(content) > CONTENT_PREVIEW:
+        content = f"{content[:CONTENT_PREVIEW]}…"
+
+    author = f"<@{row['author_id']}>" if row["author_id"] else row["author"] or "?"
+    line = f"<t:{int(row['time'])}:f> **{row['event']}** {author}"
+    if row["channel_id"]:
+        line += f" <#{row['channel_id']}>"
+    if row["channel_id"] and row["message_id"]:
+        line += f" [↗]({message_jump_url(guild_id, row['channel_id'], row['message_id'])})"
+    return f"{line}\n{content}" if content else line
+
+
+def create_search_embeds(
+    guild_id: int, rows: list[sqlite3.Row], user: discord.User
+) -> tuple[list[discord.Embed], PaginationView]:
+    embeds = []
+    for i in range(0, len(rows), RESULTS_PER_PAGE):
+        lines = [result_line(guild_id, row) for row in rows[i : i + RESULTS_PER_PAGE]]
+        embed = discord.Embed(
+            title=LoggerMess.log_search_title(count=len(rows)),
+            description="\n".join(lines)[:4096],
+            colour=discord.Color.yellow(),
+        )
+        embeds.append(embed)
+
+    view = PaginationView(user, embeds, show_page=True)
+    return embeds, view
@@ -0,0 +1,21 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line with time, event type and the fields of the record.
+
+    Guild loggers log dicts as messages, the dict becomes the fields of the line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "event": record.levelname.lower(),
+        }
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry["message"] = record.getMessage()
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -1,6 +1,9 @@
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+
+from .archiver import log_archiver
+from .formatter import JsonLinesFormatter
+from .writer import BatchedFileHandler, TargetFilter, log_writer
 
 
 def namer(name):
@@ -13,45 +16,40 @@ class GuildLogger:
     def __init__(self, guild_id):
         self.guild_id = guild_id
 
-        self._formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
+        self._formatter = JsonLinesFormatter()
 
         self.dir_path = f"logs/{self.guild_id}"
 
+        # loggers only put records to the queue of the writer, files are opened, written
+        # and closed by its thread, at most `logger.max_open_files` of all guilds at once
         self.message_logger = logging.Logger(f"message_logger_{self.guild_id}")
-        self._message_handler = self._init_file_handler("messages")
-        self._message_handler.setFormatter(self._formatter)
-        self._message_handler.namer = namer
-        self.message_logger.addHandler(self._message_handler)
+        self._message_handler = self._init_logger(self.message_logger, "messages")
 
         self.command_logger = logging.Logger(f"command_logger_{self.guild_id}")
-        self._command_handler = self._init_file_handler("commands")
-        self._command_handler.setFormatter(self._formatter)
-        self._command_handler.namer = namer
-        self.command_logger.addHandler(self._command_handler)
+        self._command_handler = self._init_logger(self.command_logger, "commands")
 
         self.reaction_logger = logging.Logger(f"reaction_logger_{self.guild_id}")
-        self._reaction_handler = self._init_file_handler("reactions")
-        self._reaction_handler.setFormatter(self._formatter)
-        self._reaction_handler.namer = namer
-        self.reaction_logger.addHandler(self._reaction_handler)
-
-    def __del__(self):
-        self.message_logger.removeHandler(self._message_handler)
-        self.command_logger.removeHandler(self._command_handler)
-        self.reaction_logger.removeHandler(self._reaction_handler)
+        self._reaction_handler = self._init_logger(self.reaction_logger, "reactions")
 
-        self._message_handler.close()
-        self._command_handler.close()
-        self._reaction_handler.close()
+    def _init_logger(self, logger: logging.Logger, dir_name: str) -> BatchedFileHandler:
+        handler = self._init_file_handler(dir_name)
+        handler.setFormatter(self._formatter)
+        handler.namer = namer
+        handler.rotator = log_archiver.rotator
+        logger.addFilter(TargetFilter(handler))
+        logger.addHandler(log_writer.handler)
+        return handler
 
     def _init_file_handler(self, dir_name):
         dir_path = f"{self.dir_path}/{dir_name}"
         os.makedirs(dir_path, exist_ok=True)
 
-        return TimedRotatingFileHandler(
-            filename=f"{dir_path}/current.log",
+        return BatchedFileHandler(
+            filename=f"{dir_path}/current.jsonl",
             when="midnight",
             interval=1,
             encoding="utf-8",
-            backupCount=365,
+            # archives are compressed and deleted by total size, see LogArchiver
+            backupCount=0,
+            delay=True,
         )
@@ -0,0 +1,72 @@
+"""
+Content of recent messages kept for delete logs, without the full message cache of discord.py.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+
+from config.app_config import config
+
+# approximate size of the record, its key and the entry of the ordered dict
+RECORD_OVERHEAD = 200
+
+
+class StoredMessage:
+    __slots__ = ("author_id", "channel_id", "content", "attachments", "size")
+
+    def __init__(self, author_id: int, channel_id: int, content: str, attachments: tuple[str, ...]):
+        self.author_id = author_id
+        self.channel_id = channel_id
+        self.content = content
+        self.attachments = attachments
+        self.size = RECORD_OVERHEAD + sys.getsizeof(content) + sum(sys.getsizeof(url) for url in attachments)
+
+
+class MessageStore:
+    """Ring buffer of message contents keyed by message ID, the oldest messages are evicted over the byte budget"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.messages: OrderedDict[int, StoredMessage] = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def add(self, message_id: int, author_id: int, channel_id: int, content: str, attachments: list[str]) -> None:
+        if self.max_bytes <= 0:
+            return
+
+        self.pop(message_id)
+        record = StoredMessage(author_id, channel_id, content, tuple(attachments))
+        self.messages[message_id] = record
+        self.size += record.size
+        self.evict()
+
+    def update_content(self, message_id: int, content: str) -> None:
+        """Keep the edited content, position of the message in the buffer doesn't change"""
+        record = self.messages.get(message_id)
+        if record is None:
+            return
+        edited = StoredMessage(record.author_id, record.channel_id, content, record.attachments)
+        self.messages[message_id] = edited
+        self.size += edited.size - record.size
+        self.evict()
+
+    def evict(self) -> None:
+        while self.size > self.max_bytes and self.messages:
+            _, evicted = self.messages.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    def pop(self, message_id: int) -> StoredMessage | None:
+        record = self.messages.pop(message_id, None)
+        if record is not None:
+            self.size -= record.size
+        return record
+
+
+message_store = MessageStore(config.message_store_mb * 1024 * 1024)
@@ -2,4 +2,11 @@ from config.messages import GlobalMessages
 
 
 class LoggerMess(GlobalMessages):
-    pass
+    log_stats_brief = "Statistics of the guild log writer"
+    log_stats_title = "Guild log writer"
+    log_search_brief = "Search guild logs by text, author, channel, date and event"
+    log_search_title = "Log search ({count} newest results)"
+    log_search_no_results = "No logged events match the search"
+    log_search_invalid_date = "Invalid date, use format YYYY-MM-DD"
+    log_search_text_param = "Words which must all be in the content"
+    log_search_date_param = "Date in format YYYY-MM-DD, UTC"
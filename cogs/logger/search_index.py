@@ -0,0 +1,268 @@
+"""
+Full-text index of guild logs in a SQLite FTS5 database per guild.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+from config.app_config import config
+
+from .archiver import LOGS_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    event TEXT NOT NULL,
+    channel_id INTEGER,
+    message_id INTEGER,
+    author_id INTEGER,
+    author TEXT,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_events_time ON events (time);
+CREATE INDEX IF NOT EXISTS ix_events_author_time ON events (author_id, time);
+CREATE INDEX IF NOT EXISTS ix_events_channel_time ON events (channel_id, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5 (content, content='events', content_rowid='id');
+"""
+
+INSERT_EVENT = """
+INSERT INTO events (time, event, channel_id, message_id, author_id, author, content)
+VALUES (:time, :event, :channel_id, :message_id, :author_id, :author, :content)
+"""
+
+
+def index_path(guild_id: int) -> str:
+    return f"{LOGS_DIR}/{guild_id}/search.sqlite3"
+
+
+# events logged to each log directory, pruned together with its archives
+DIRECTORY_EVENTS = {
+    "messages": ("message", "edit", "delete"),
+    "reactions": ("reaction",),
+    "commands": ("command",),
+}
+
+
+def connect(guild_id: int) -> sqlite3.Connection:
+    os.makedirs(f"{LOGS_DIR}/{guild_id}", exist_ok=True)
+    conn = sqlite3.connect(index_path(guild_id), check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def indexed_text(event: str, fields: dict) -> str:
+    """Searchable text of the logged event"""
+    if event == "reaction":
+        return fields.get("emoji") or ""
+    if event == "command":
+        return f"{fields.get('command', '')} {fields.get('arguments', '')}"
+    return fields.get("content") or ""
+
+
+def match_query(text: str) -> str:
+    """Every word of the text must be in the content, words are quoted so FTS5 syntax is not interpreted"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class ConnectionPool:
+    """Keeps at most `max_open` index databases open, databases used least recently are closed first.
+
+    Each open database holds the database, WAL and shared memory files. Connections are used by the
+    indexer, archiver and search threads, the lock serializes them.
+    """
+
+    def __init__(self, max_open: int):
+        self.max_open = max(max_open, 1)
+        self.connections: OrderedDict[int, sqlite3.Connection] = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    @contextmanager
+    def connection(self, guild_id: int) -> Iterator[sqlite3.Connection]:
+        with self.lock:
+            conn = self.connections.get(guild_id)
+            if conn is None:
+                conn = connect(guild_id)
+                self.connections[guild_id] = conn
+                while len(self.connections) > self.max_open:
+                    _, evicted = self.connections.popitem(last=False)
+                    evicted.close()
+                    self.evictions += 1
+            else:
+                self.connections.move_to_end(guild_id)
+            yield conn
+
+    def close_all(self) -> None:
+        with self.lock:
+            for conn in self.connections.values():
+                conn.close()
+            self.connections.clear()
+
+
+class LogIndexer:
+    """Thread inserting logged events to the index of their guild, one transaction per guild and batch.
+
+    Each guild has its own database next to its logs, opened through the connection pool.
+    """
+
+    def __init__(self):
+        self.queue: queue.Queue[tuple[int, dict] | None] = queue.Queue(maxsize=config.logger_queue_size)
+        self.thread: threading.Thread | None = None
+        self.pool = ConnectionPool(config.logger_max_open_files)
+        self.indexed = 0
+        self.pruned = 0
+        self.dropped = 0
+
+    def add(self, guild_id: int, event: str, fields: dict) -> None:
+        """Queue logged event for indexing, events are dropped when the indexer falls behind"""
+        row = {
+            "time": time.time(),
+            "event": event,
+            "channel_id": fields.get("channel_id"),
+            "message_id": fields.get("message_id"),
+            "author_id": fields.get("author_id"),
+            "author": fields.get("author"),
+            "content": indexed_text(event, fields),
+        }
+        try:
+            self.queue.put_nowait((guild_id, row))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name="log_indexer", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        self.pool.close_all()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < config.logger_batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_guild: dict[int, list[dict]] = {}
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                guild_id, row = item
+                by_guild.setdefault(guild_id, []).append(row)
+
+            for guild_id, rows in by_guild.items():
+                try:
+                    self.insert(guild_id, rows)
+                except sqlite3.Error as e:
+                    logging.warning(f"Failed to index logs of guild {guild_id}: {e!r}")
+
+            if stop:
+                return
+
+    def insert(self, guild_id: int, rows: list[dict]) -> None:
+        with self.pool.connection(guild_id) as conn, conn:
+            for row in rows:
+                cursor = conn.execute(INSERT_EVENT, row)
+                conn.execute(
+                    "INSERT INTO events_fts (rowid, content) VALUES (?, ?)", (cursor.lastrowid, row["content"])
+                )
+        self.indexed += len(rows)
+
+    def prune_archive(self, path: str) -> None:
+        """Delete indexed events of an archive deleted by retention, e.g. logs/<guild>/messages/current.<date>.jsonl.gz
+
+        Called by the archiver thread, events up to the end of the archived day are deleted.
+        """
+        _, guild_dir, log_dir, filename = path.replace(os.sep, "/").rsplit("/", 3)
+        events = DIRECTORY_EVENTS.get(log_dir)
+        if events is None or not guild_dir.isdigit() or not os.path.exists(index_path(int(guild_dir))):
+            return
+
+        # rotation names files by the local date, like the file handlers
+        date = filename.split(".")[1]
+        try:
+            before = time.mktime(time.strptime(date, "%Y-%m-%d")) + 24 * 60 * 60
+        except ValueError:
+            # archive not named by the rotation, its events can't be told apart
+            logging.warning(f"Skipped pruning search index of {path}, the name has no date")
+            return
+        placeholders = ", ".join("?" * len(events))
+        condition = f"event IN ({placeholders}) AND time < ?"
+        try:
+            with self.pool.connection(int(guild_dir)) as conn, conn:
+                # external content FTS table needs the deleted content to remove its terms
+                conn.execute(
+                    f"INSERT INTO events_fts (events_fts, rowid, content) "
+                    f"SELECT 'delete', id, content FROM events WHERE {condition}",
+                    [*events, before],
+                )
+                cursor = conn.execute(f"DELETE FROM events WHERE {condition}", [*events, before])
+        except sqlite3.Error as e:
+            logging.warning(f"Failed to prune search index of {path}: {e!r}")
+            return
+        self.pruned += cursor.rowcount
+
+
+def search(
+    guild_id: int,
+    limit: int,
+    text: str | None = None,
+    author_id: int | None = None,
+    channel_id: int | None = None,
+    event: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+) -> list[sqlite3.Row]:
+    """Newest events matching all given filters, blocking, run it in a thread"""
+    if not os.path.exists(index_path(guild_id)):
+        return []
+
+    conditions, params = [], []
+    if text:
+        conditions.append("id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+        params.append(match_query(text))
+    for column, value in (("author_id", author_id), ("channel_id", channel_id), ("event", event)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        conditions.append("time >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("time < ?")
+        params.append(until)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    statement = f"SELECT * FROM events {where} ORDER BY time DESC LIMIT ?"
+    with log_indexer.pool.connection(guild_id) as conn:
+        return conn.execute(statement, [*params, limit]).fetchall()
+
+
+log_indexer = LogIndexer()
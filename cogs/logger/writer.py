@@ -0,0 +1,222 @@
+"""
+Background writer of guild logs, keeps file writes and rotations off the event loop.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+from config.app_config import config
+
+
+class BatchedFileHandler(TimedRotatingFileHandler):
+    """Rotating file handler which is flushed once per batch instead of after every record"""
+
+    def flush(self) -> None:
+        # called by emit after every record, the writer calls flush_batch instead
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+    def release_file(self) -> None:
+        """Close the file but keep the handler usable, the file is opened again by the next record"""
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+
+
+class HandlerPool:
+    """Keeps at most `max_open` log files open, files written least recently are closed first.
+
+    Handlers are created with delay, so a file is opened only when a record is written to it.
+    Used only by the writer thread, which is the only one writing the files.
+    """
+
+    def __init__(self, max_open: int):
+        self.max_open = max(max_open, 1)
+        self.handlers: OrderedDict[BatchedFileHandler, None] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.handlers)
+
+    def touch(self, handler: BatchedFileHandler) -> None:
+        """Mark handler as just written, close least recently used files over the limit"""
+        if handler in self.handlers:
+            self.handlers.move_to_end(handler)
+            return
+
+        self.handlers[handler] = None
+        while len(self.handlers) > self.max_open:
+            evicted, _ = self.handlers.popitem(last=False)
+            evicted.release_file()
+            self.evictions += 1
+
+    def release_all(self) -> None:
+        for handler in self.handlers:
+            handler.release_file()
+        self.handlers.clear()
+
+
+class TargetFilter(logging.Filter):
+    """Attach file handler of the logger to its records, the writer thread routes them by it"""
+
+    def __init__(self, handler: logging.Handler):
+        super().__init__()
+        self.handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.target_handler = self.handler
+        return True
+
+
+class WriterStats:
+    def __init__(self):
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.batches = 0
+        self.queue_peak = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(vars(self))
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler with a bounded queue.
+
+    With policy "drop" records are dropped when the queue is full. With "block" the event loop
+    waits up to `block_timeout` seconds for the writer, then the record is dropped anyway so
+    a stalled disk can't freeze the bot.
+    """
+
+    def __init__(self, log_queue: queue.Queue, stats: WriterStats, policy: str, block_timeout: float):
+        super().__init__(log_queue)
+        self.stats = stats
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy != "block" or not self._put_blocking(record):
+                self.stats.dropped += 1
+                if self.stats.dropped == 1 or self.stats.dropped % 1000 == 0:
+                    logging.warning(f"Guild log queue is full, {self.stats.dropped} records dropped")
+                return
+
+        self.stats.enqueued += 1
+        self.stats.queue_peak = max(self.stats.queue_peak, self.queue.qsize())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # structured records are formatted by the writer thread, not on the event loop
+        if isinstance(record.msg, dict):
+            return record
+        return super().prepare(record)
+
+    def _put_blocking(self, record: logging.LogRecord) -> bool:
+        self.stats.blocked += 1
+        try:
+            self.queue.put(record, timeout=self.block_timeout)
+        except queue.Full:
+            return False
+        return True
+
+
+class BatchingQueueListener(QueueListener):
+    """Writes records in batches, handlers are flushed once after each batch"""
+
+    def __init__(self, log_queue: queue.Queue, stats: WriterStats, batch_size: int, pool: HandlerPool):
+        super().__init__(log_queue, respect_handler_level=False)
+        self.stats = stats
+        self.batch_size = batch_size
+        self.pool = pool
+
+    def enqueue_sentinel(self) -> None:
+        # queue can be full when stopping, wait for the writer to make space
+        self.queue.put(self._sentinel)
+
+    def _monitor(self) -> None:
+        has_task_done = hasattr(self.queue, "task_done")
+        while True:
+            # wait for the first record, then take whatever else is already queued
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = self.write_batch(batch)
+            if has_task_done:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def write_batch(self, batch: list[logging.LogRecord | None]) -> bool:
+        """Write records of the batch, returns True when the stop sentinel was in it"""
+        # records are grouped by file, so every file is opened and flushed at most once per batch
+        by_handler: dict[BatchedFileHandler, list[logging.LogRecord]] = {}
+        stop = False
+        for record in batch:
+            if record is self._sentinel:
+                stop = True
+                continue
+            by_handler.setdefault(record.target_handler, []).append(record)
+
+        for handler, records in by_handler.items():
+            for record in records:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    handler.handleError(record)
+            handler.flush_batch()
+            self.pool.touch(handler)
+
+        self.stats.written += len(batch) - stop
+        self.stats.batches += 1
+        return stop
+
+
+class LogWriter:
+    """Queue shared by all guild loggers and the thread writing it to files"""
+
+    def __init__(self):
+        self.stats = WriterStats()
+        self.queue: queue.Queue = queue.Queue(maxsize=config.logger_queue_size)
+        self.handler = BoundedQueueHandler(
+            self.queue, self.stats, config.logger_overflow_policy, config.logger_block_timeout
+        )
+        self.pool = HandlerPool(config.logger_max_open_files)
+        self.listener = BatchingQueueListener(self.queue, self.stats, config.logger_batch_size, self.pool)
+        self._lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> None:
+        with self._lock:
+            if not self.running:
+                self.listener.start()
+                self.running = True
+
+    def stop(self) -> None:
+        """Write all queued records, stop the thread and close all files"""
+        with self._lock:
+            if self.running:
+                self.listener.stop()
+                self.pool.release_all()
+                self.running = False
+
+
+log_writer = LogWriter()
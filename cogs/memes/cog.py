@@ -19,6 +19,8 @@ if TYPE_CHECKING:
 
 
 class Memes(Base, commands.Cog):
+    intents = discord.Intents(guild_messages=True, message_content=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
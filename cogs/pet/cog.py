@@ -6,16 +6,19 @@ from typing import TYPE_CHECKING
 import discord
 from discord import app_commands
 from discord.ext import commands
-from PIL import Image, ImageDraw
 
 from cogs.base import Base
 from custom.cooldowns import default_cooldown
+from utils.lazy_import import lazy_import
 
 from .messages import PetMess
 
 if TYPE_CHECKING:
     from morpheus import Morpheus
 
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+
 
 class Pet(Base, commands.Cog):
     def __init__(self, bot: Morpheus):
@@ -31,6 +34,8 @@ class Pet(Base, commands.Cog):
             return
 
         avatar = await user.display_avatar.read()
+        await Image.load()
+        await ImageDraw.load()
         avatarFull = Image.open(BytesIO(avatar))
 
         frames = []
@@ -1,8 +1,18 @@
+from __future__ import annotations
+
 from io import StringIO
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
+
+from utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# pandas and bs4 are heavy to import and needed only when someone asks for the menu
+pd = lazy_import("pandas")
+bs4 = lazy_import("bs4")
 
 
 class RestaurantsScraper:
@@ -26,7 +36,7 @@ class RestaurantsScraper:
     async def get_soup(self) -> BeautifulSoup:
         async with self.session.get(self.url) as response:
             content = await response.content.read()
-        soup = BeautifulSoup(content, "html.parser", from_encoding="utf-8")
+        soup = bs4.BeautifulSoup(content, "html.parser", from_encoding="utf-8")
         return soup
 
     def get_restaurants(self) -> list[str]:
@@ -35,6 +45,8 @@ class RestaurantsScraper:
 
     async def get_menu(self, restaurant) -> tuple[bytes, str] | tuple[str, str]:
         if restaurant in self.restaurants:
+            await pd.load()
+            await bs4.load()
             return await self.restaurants[restaurant]()
         else:
             raise Exception("Restaurant not found")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import io
+import json
 from typing import TYPE_CHECKING
 
 import discord
@@ -9,7 +11,9 @@ from discord.ext import commands
 from cogs.base import Base
 from custom.cooldowns import default_cooldown
 from custom.permission_check import is_bot_admin
+from database.instrumentation import query_stats
 from utils.embed import info_embed
+from utils.startup import startup_report
 
 from . import features
 from .buttons import SystemView
@@ -58,6 +62,32 @@ class System(Base, commands.Cog):
         embed = info_embed(self.bot)
         await inter.edit_original_response(embed=embed)
 
+    @app_commands.check(is_bot_admin)
+    @app_commands.command(name="startup", description=SystemMess.startup_brief)
+    async def startup(self, inter: discord.Interaction):
+        """Sends startup timings as embed together with the full report in JSON"""
+        report = json.dumps(startup_report.as_dict(), indent=4).encode()
+        file = discord.File(io.BytesIO(report), filename="startup.json")
+        await inter.response.send_message(embed=features.create_startup_embed(), file=file)
+
+    @app_commands.check(is_bot_admin)
+    @app_commands.command(name="db_pool", description=SystemMess.db_pool_brief)
+    async def db_pool(self, inter: discord.Interaction):
+        await inter.response.send_message(embed=features.create_db_pool_embed())
+
+    @app_commands.check(is_bot_admin)
+    @app_commands.command(name="db_queries", description=SystemMess.db_queries_brief)
+    @app_commands.describe(count=SystemMess.db_queries_count)
+    async def db_queries(self, inter: discord.Interaction, count: app_commands.Range[int, 1, 10] = 10):
+        """Sends statements with the highest total time together with their full stats in JSON"""
+        if not query_stats.statements:
+            await inter.response.send_message(SystemMess.db_queries_empty, ephemeral=True)
+            return
+
+        report = json.dumps([stats.as_dict() for stats in query_stats.top(count)], indent=4).encode()
+        file = discord.File(io.BytesIO(report), filename="db_queries.json")
+        await inter.response.send_message(embed=features.create_db_queries_embed(count), file=file)
+
     @cogs.error
     async def on_command_error(self, ctx: commands.Context, error):
         if isinstance(error.__cause__, commands.errors.ExtensionNotLoaded):
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import os
+import textwrap
 from os.path import isdir, isfile
 from typing import TYPE_CHECKING
 
 import discord
 
 from config.app_config import config
+from database.database import database
+from database.guild import guild_settings_cache
+from database.instrumentation import query_stats
 from utils.general import split
+from utils.startup import startup_report
 
 from .messages import SystemMess
 
@@ -97,3 +102,61 @@ def create_embed(bot: Morpheus) -> discord.Embed:
 
     embed.set_footer(text=SystemMess.override)
     return embed
+
+
+def create_startup_embed() -> discord.Embed:
+    embed = discord.Embed(title=SystemMess.startup_title, colour=discord.Color.yellow())
+    embed.description = SystemMess.startup_description(setup_time=startup_report.setup_time)
+
+    phases = [f"{name} - {elapsed:.2f} s" for name, elapsed in startup_report.phases.items()]
+    embed.add_field(name="Phases", value="\n".join(phases) or "-", inline=False)
+
+    cogs = [
+        f"{timing.name} - {timing.import_time:.2f} s / {timing.setup_time:.2f} s"
+        for timing in startup_report.slowest_cogs(10)
+    ]
+    embed.add_field(name="Slowest cogs (import / setup)", value="\n".join(cogs) or "-", inline=False)
+
+    if startup_report.lazy_imports:
+        lazy = [f"{name} - {elapsed:.2f} s" for name, elapsed in startup_report.lazy_imports.items()]
+        embed.add_field(name="Lazy imports", value="\n".join(lazy), inline=False)
+    return embed
+
+
+def create_db_pool_embed() -> discord.Embed:
+    status = database.pool_status()
+    embed = discord.Embed(title=SystemMess.db_pool_title, colour=discord.Color.yellow())
+    embed.add_field(name="Size", value=status["size"])
+    embed.add_field(name="In use", value=status["in_use"])
+    embed.add_field(name="Idle", value=status["idle"])
+    embed.add_field(name="Overflow", value=status["overflow"])
+    embed.add_field(name="Overflow events", value=status["overflow_events"])
+    embed.add_field(name="Timeouts", value=status["timeouts"])
+    embed.add_field(name="Checkouts", value=status["checkouts"])
+    embed.add_field(name="Connects", value=status["connects"])
+    embed.add_field(name="Wait avg", value=f"{status['wait_avg_ms']:.2f} ms")
+    embed.add_field(name="Wait max", value=f"{status['wait_max_ms']:.2f} ms")
+
+    guild_cache = guild_settings_cache.stats()
+    embed.add_field(name="Guild cache", value=f"{guild_cache['hits']} hits / {guild_cache['misses']} misses")
+    return embed
+
+
+def create_db_queries_embed(count: int) -> discord.Embed:
+    embed = discord.Embed(title=SystemMess.db_queries_title, colour=discord.Color.yellow())
+    embed.description = SystemMess.db_queries_description(
+        statements=len(query_stats.statements), slow=query_stats.slow_queries
+    )
+    for position, stats in enumerate(query_stats.top(count), start=1):
+        caller = stats.callers.most_common(1)[0][0]
+        statement = textwrap.shorten(stats.statement, width=300, placeholder="...")
+        embed.add_field(
+            name=f"{position}. {caller}",
+            value=(
+                f"```sql\n{statement}```"
+                f"{stats.count}x, total {stats.total * 1000:.1f} ms, avg {stats.avg * 1000:.2f} ms, "
+                f"max {stats.max * 1000:.1f} ms, {stats.rows} rows"
+            ),
+            inline=False,
+        )
+    return embed
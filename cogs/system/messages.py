@@ -16,3 +16,13 @@ class SystemMess(GlobalMessages):
     embed_description = "```✅ Loaded ({loaded}) / ❌ Unloaded ({unloaded}) / 🔄 All ({all})```"
     override = "📄 Bold items are overrides of config.extension"
     morpheus_brief = "Information about Morpheus"
+    db_pool_brief = "Database connection pool usage"
+    db_pool_title = "Database pool"
+    db_queries_brief = "Statements with the highest total database time"
+    db_queries_count = "Number of statements"
+    db_queries_title = "Top database statements"
+    db_queries_description = "```{statements} statements tracked, {slow} slow queries```"
+    db_queries_empty = "No statements recorded yet"
+    startup_brief = "Timings of the last bot startup"
+    startup_title = "Startup report"
+    startup_description = "```Setup {setup_time:.2f} s```"
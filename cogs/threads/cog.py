@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import discord
 from discord.ext import commands
 
 from cogs.base import Base
@@ -12,6 +13,8 @@ if TYPE_CHECKING:
 
 
 class Threads(Base, commands.Cog):
+    intents = discord.Intents(guild_messages=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
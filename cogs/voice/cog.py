@@ -7,13 +7,14 @@ from typing import TYPE_CHECKING, cast
 import discord
 import wavelink
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from cogs.base import Base
 from database.voice import PlaylistDB
 
 from .features import Autocomplete, VoiceFeatures, WavelinkPlayer
 from .messages import VoiceMess
+from .nodes import node_balancer
 from .views import VoiceView
 
 if TYPE_CHECKING:
@@ -33,10 +34,24 @@ class PlaylistGroup(app_commands.Group):
 
 
 class Voice(Base, commands.Cog):
+    intents = discord.Intents(voice_states=True)
+
     def __init__(self, bot: Morpheus):
         super().__init__()
         self.bot = bot
         Autocomplete.bot = bot
+        self.tasks = [self.refresh_node_stats.start()]
+
+    @tasks.loop(seconds=Base.config.lavalink_stats_interval)
+    async def refresh_node_stats(self):
+        await node_balancer.refresh()
+        for player in await node_balancer.recover(self.bot):
+            await self.announce_migration(player)
+
+    @staticmethod
+    async def announce_migration(player: WavelinkPlayer) -> None:
+        if hasattr(player, "home"):
+            await player.home.channel.send(embed=VoiceFeatures.create_embed(description=VoiceMess.player_migrated))
 
     voice_group = VoiceGroup(name="voice", description=VoiceMess.voice_group_brief)
     playlist_group = PlaylistGroup(name="playlist", description=VoiceMess.playlist_group_brief)
@@ -270,6 +285,15 @@ class Voice(Base, commands.Cog):
     async def on_wavelink_node_ready(self, payload: wavelink.NodeReadyEventPayload) -> None:
         logging.info(VoiceMess.node_connected(node=f"{payload.node!r}", resumed=payload.resumed))
 
+    @commands.Cog.listener()
+    async def on_wavelink_node_closed(self, node: wavelink.Node, disconnected: list[WavelinkPlayer]) -> None:
+        logging.warning(VoiceMess.node_closed(node=f"{node!r}", players=len(disconnected)))
+        await node_balancer.refresh()
+        for old_player in disconnected:
+            player = await node_balancer.migrate_player(old_player)
+            if player:
+                await self.announce_migration(player)
+
     @commands.Cog.listener()
     async def on_wavelink_inactive_player(self, player: WavelinkPlayer) -> None:
         description = VoiceMess.inactive(time=player.inactive_timeout)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import textwrap
 from datetime import timedelta
 from typing import TYPE_CHECKING, cast
@@ -9,11 +10,13 @@ import wavelink
 from discord import app_commands
 
 from database.voice import PlaylistDB
+from utils.cache import MISSING, TTLCache
 from utils.embed import PaginationView
 from utils.interaction import custom_send
 from utils.user import get_or_fetch_user
 
 from .messages import VoiceMess
+from .nodes import node_balancer
 
 if TYPE_CHECKING:
     from morpheus import Morpheus
@@ -32,6 +35,16 @@ class WavelinkPlayer(wavelink.Player):
     view: views.VoiceView
     message: discord.Message
 
+    def __init__(
+        self,
+        client: discord.Client = discord.utils.MISSING,
+        channel: discord.abc.Connectable = discord.utils.MISSING,
+        *,
+        nodes: list[wavelink.Node] | None = None,
+    ) -> None:
+        # discord.py creates the player without nodes, place it on the least loaded one
+        super().__init__(client, channel, nodes=nodes or [node_balancer.best_node()])
+
 
 class VoiceFeatures:
     @classmethod
@@ -245,33 +258,74 @@ class VoiceFeatures:
         return True
 
 
+# author id -> display name of playlist authors shown by autocomplete
+author_name_cache = TTLCache(ttl=3600, maxsize=5000)
+
+# autocomplete must answer within 3 seconds, slower fetches finish in background for next keystroke
+AUTHOR_FETCH_TIMEOUT = 1.5
+
+
 class Autocomplete:
     bot: Morpheus
+    # author id -> running fetch, concurrent keystrokes wait for the same request
+    pending_fetches: dict[str, asyncio.Task] = {}
 
     @classmethod
     def truncate_string(cls, string: str, limit: int = 100) -> str:
         return textwrap.shorten(string, width=limit, placeholder="...")
 
     @classmethod
-    async def playlist_name(cls, bot: Morpheus, playlist: PlaylistDB) -> str:
+    async def fetch_author_name(cls, author_id: str) -> str | None:
+        user = await get_or_fetch_user(cls.bot, int(author_id))
+        if user:
+            author_name_cache.set(author_id, user.display_name)
+            return user.display_name
+        return None
+
+    @classmethod
+    async def author_names(cls, author_ids: set[str]) -> dict[str, str]:
+        """Display names of authors, unknown authors are fetched concurrently"""
+        names: dict[str, str] = {}
+        for author_id in author_ids:
+            name = author_name_cache.get(author_id)
+            if name is MISSING and (user := cls.bot.get_user(int(author_id))):
+                name = user.display_name
+                author_name_cache.set(author_id, name)
+            if name is not MISSING:
+                names[author_id] = name
+                continue
+
+            if author_id not in cls.pending_fetches:
+                task = asyncio.create_task(cls.fetch_author_name(author_id))
+                task.add_done_callback(lambda _, author_id=author_id: cls.pending_fetches.pop(author_id, None))
+                cls.pending_fetches[author_id] = task
+
+        pending = [cls.pending_fetches[author_id] for author_id in author_ids - names.keys()]
+        if pending:
+            await asyncio.wait(pending, timeout=AUTHOR_FETCH_TIMEOUT)
+
+        for author_id in author_ids - names.keys():
+            names[author_id] = author_name_cache.get(author_id, default=author_id)
+        return names
+
+    @classmethod
+    def playlist_name(cls, bot: Morpheus, playlist: PlaylistDB, author_name: str) -> str:
         guild = bot.get_guild(int(playlist.guild_id)) if playlist.guild_id else None
-        author = await get_or_fetch_user(bot, int(playlist.author_id))
         if not guild:
-            return cls.truncate_string(f"[{author.display_name}] - {playlist.name}")
+            return cls.truncate_string(f"[{author_name}] - {playlist.name}")
 
-        return cls.truncate_string(f"[{author.display_name} | {guild.name}] - {playlist.name}")
+        return cls.truncate_string(f"[{author_name} | {guild.name}] - {playlist.name}")
 
     @classmethod
-    async def create_choices(cls, playlists: list[PlaylistDB], user_input: str) -> list[app_commands.Choice[str]]:
-        playlists_found = [
+    async def create_choices(cls, playlists: list[PlaylistDB]) -> list[app_commands.Choice[str]]:
+        names = await cls.author_names({playlist.author_id for playlist in playlists})
+        return [
             app_commands.Choice(
-                name=await Autocomplete.playlist_name(cls.bot, playlist),
+                name=cls.playlist_name(cls.bot, playlist, names[playlist.author_id]),
                 value=f"{playlist.id}",
             )
-            for playlist in playlists
-            if user_input in playlist.name.lower()
-        ][:25]
-        return playlists_found
+            for playlist in playlists[:25]
+        ]
 
     @classmethod
     async def autocomp_play(cls, inter: discord.Interaction, user_input: str) -> list[app_commands.Choice[str]]:
@@ -294,8 +348,8 @@ class Autocomplete:
 
     @classmethod
     async def autocomp_playlists(cls, inter: discord.Interaction, user_input: str) -> list[app_commands.Choice[str]]:
-        playlists = await PlaylistDB.get_available_playlists(str(inter.guild.id), str(inter.user.id))
-        playlists_found = await cls.create_choices(playlists, user_input.lower())
+        playlists = await PlaylistDB.search_available_playlists(str(inter.guild.id), str(inter.user.id), user_input)
+        playlists_found = await cls.create_choices(playlists)
 
         if not playlists_found:
             return [app_commands.Choice(name=VoiceMess.no_playlist_found, value="")]
@@ -306,8 +360,8 @@ class Autocomplete:
     async def autocomp_remove_playlists(
         cls, inter: discord.Interaction, user_input: str
     ) -> list[app_commands.Choice[str]]:
-        playlists = await PlaylistDB.get_author_playlists(str(inter.user.id))
-        playlists_found = await cls.create_choices(playlists, user_input.lower())
+        playlists = await PlaylistDB.search_author_playlists(str(inter.user.id), user_input)
+        playlists_found = await cls.create_choices(playlists)
 
         if not playlists_found:
             return [app_commands.Choice(name=VoiceMess.no_playlist_found, value="")]
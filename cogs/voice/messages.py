@@ -61,5 +61,7 @@ class VoiceMess(GlobalMessages):
     playlist_not_found = "Given playlist was not found."
     playlist_removed = "Playlist `{name}` has been removed\n- {url}"
     node_connected = "Wavelink Node connected: {node} | Resumed: {resumed}"
+    node_closed = "Wavelink Node closed: {node} | Players to migrate: {players}"
+    player_migrated = "Lavalink node went down, playback moved to another node."
     is_global_param = "Make playlist visible for you everywhere."
     playlist_param = "Use autocomplete or input ID of playlist"
@@ -0,0 +1,175 @@
+"""
+Placement of players on Lavalink nodes and migration of players from dropped nodes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+import aiohttp
+import discord
+import wavelink
+
+from config.app_config import config
+from utils.constants import LAVALINK_NODE_RETRIES
+
+if TYPE_CHECKING:
+    from .features import WavelinkPlayer
+
+
+def node_retries(identifier: str) -> int | None:
+    for node_config in config.lavalink_nodes:
+        if node_config.get("identifier") == identifier:
+            return node_config.get("retries", LAVALINK_NODE_RETRIES)
+    return LAVALINK_NODE_RETRIES
+
+
+def node_penalty(stats: wavelink.StatsResponsePayload) -> float:
+    """Load penalty of the node computed from cpu and frame stats.
+
+    Follows the formula used by Lavalink clients. Penalties grow exponentially,
+    so a node dropping frames or under heavy cpu load is avoided even with few players.
+    """
+    penalty = 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+    if stats.frames:
+        penalty += 1.03 ** (500 * (stats.frames.deficit / 3000)) * 600 - 600
+        penalty += (1.03 ** (500 * (stats.frames.nulled / 3000)) * 300 - 300) * 2
+    return penalty
+
+
+class NodeBalancer:
+    """Chooses the least loaded connected node for new players and recovers from nodes going down.
+
+    wavelink doesn't close a node whose reconnects ran out, the node is only left disconnected
+    with its players, so nodes are checked together with the stats refresh.
+    """
+
+    def __init__(self):
+        self.penalties: dict[str, float] = {}
+        # nodes not connected at the previous check, their players move once they stay down
+        self.unavailable: set[str] = set()
+        self.reconnecting: set[str] = set()
+
+    @staticmethod
+    def connected_nodes() -> list[wavelink.Node]:
+        return [node for node in wavelink.Pool.nodes.values() if node.status is wavelink.NodeStatus.CONNECTED]
+
+    async def refresh(self) -> None:
+        """Fetch stats of all nodes, nodes that fail to respond lose their penalty"""
+        nodes = list(wavelink.Pool.nodes.values())
+        results = await asyncio.gather(*(self._fetch_stats(node) for node in nodes))
+        for node, stats in zip(nodes, results):
+            if stats is None:
+                self.penalties.pop(node.identifier, None)
+            else:
+                self.penalties[node.identifier] = node_penalty(stats)
+
+    async def _fetch_stats(self, node: wavelink.Node) -> wavelink.StatsResponsePayload | None:
+        if node.status is not wavelink.NodeStatus.CONNECTED:
+            return None
+        try:
+            return await node.fetch_stats()
+        except (wavelink.WavelinkException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning(f"Failed to fetch stats of Lavalink node {node.identifier}: {e!r}")
+            return None
+
+    def score(self, node: wavelink.Node) -> float:
+        # players are counted locally so placements between stats refreshes are taken into account
+        return len(node.players) + self.penalties.get(node.identifier, 0)
+
+    def best_node(self) -> wavelink.Node:
+        nodes = self.connected_nodes()
+        if not nodes:
+            # raises InvalidNodeException with explanation
+            return wavelink.Pool.get_node()
+        return min(nodes, key=self.score)
+
+    async def recover(self, client: discord.Client) -> list[WavelinkPlayer]:
+        """Move players off nodes down since the previous check and connect again nodes which gave up.
+
+        Returns the migrated players.
+        """
+        nodes = list(wavelink.Pool.nodes.values())
+        down = {node.identifier for node in nodes if node.status is not wavelink.NodeStatus.CONNECTED}
+        # node down at one check can be resuming its session, players move only if it is still down
+        stale = down & self.unavailable
+        self.unavailable = down
+
+        migrated = []
+        if stale and self.connected_nodes():
+            for old_player in list(client.voice_clients):
+                if isinstance(old_player, wavelink.Player) and old_player.node.identifier in stale:
+                    player = await self.migrate_player(old_player)
+                    if player:
+                        migrated.append(player)
+
+        for node in nodes:
+            if node.status is wavelink.NodeStatus.DISCONNECTED and node.identifier not in self.reconnecting:
+                self.reconnecting.add(node.identifier)
+                asyncio.create_task(self.reconnect(node, client))
+        return migrated
+
+    async def reconnect(self, closed: wavelink.Node, client: discord.Client) -> None:
+        """Replace node which ran out of reconnects with a new node of the same settings.
+
+        If the new node gives up too, the next check replaces it again.
+        """
+        try:
+            await closed.close(eject=True)
+            node = wavelink.Node(
+                identifier=closed.identifier,
+                uri=closed.uri,
+                password=closed.password,
+                heartbeat=closed.heartbeat,
+                retries=node_retries(closed.identifier),
+            )
+            await wavelink.Pool.connect(nodes=[node], client=client)
+        except (wavelink.WavelinkException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning(f"Failed to reconnect Lavalink node {closed.identifier}: {e!r}")
+        finally:
+            self.reconnecting.discard(closed.identifier)
+
+    async def migrate_player(self, old_player: WavelinkPlayer) -> WavelinkPlayer | None:
+        """Reconnect player of unavailable node on another node and continue where it stopped.
+
+        The old player keeps its channel, queue and current track, it is disconnected before
+        the new player joins the channel.
+        """
+        channel = old_player.channel
+        if channel is None or not self.connected_nodes():
+            return None
+
+        queue = list(old_player.queue)
+        current, position, volume = old_player.current, old_player.position, old_player.volume
+        if old_player.connected:
+            try:
+                await old_player.disconnect()
+            except Exception as e:
+                # node is down, destroying the player on it fails
+                logging.debug(f"Failed to disconnect player of unavailable node: {e!r}")
+
+        try:
+            player: WavelinkPlayer = await channel.connect(cls=type(old_player), self_deaf=True)
+        except (discord.ClientException, wavelink.WavelinkException, asyncio.TimeoutError) as e:
+            logging.warning(f"Failed to migrate player in guild {channel.guild.id}: {e!r}")
+            return None
+
+        if hasattr(old_player, "home"):
+            player.home = old_player.home
+        player.autoplay = old_player.autoplay
+        if queue:
+            player.queue.put(queue)
+
+        if current:
+            await player.play(current, start=position, volume=volume)
+        elif not player.queue.is_empty:
+            await player.play(player.queue.get(), volume=volume)
+
+        if hasattr(old_player, "message"):
+            await old_player.message.edit(view=None)
+        return player
+
+
+node_balancer = NodeBalancer()
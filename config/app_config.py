@@ -36,11 +36,51 @@ class Config:
     admin_ids: list[int] = get_attr(toml_dict, "base", "admin_ids")
     guild_id: int = get_attr(toml_dict, "base", "guild_id")
     default_prefix: str = get_attr(toml_dict, "base", "default_prefix")
+    command_tree_cache: str = get_attr(toml_dict, "base", "command_tree_cache")
+
+    # Sharding
+    sharding_enabled: bool = get_attr(toml_dict, "sharding", "enabled")
+    shard_count: int = get_attr(toml_dict, "sharding", "shard_count")
+    shard_ids: list[int] = get_attr(toml_dict, "sharding", "shard_ids")
+
+    # Intents and cache
+    intents_all: bool = get_attr(toml_dict, "intents", "all")
+    intents_base: list[str] = get_attr(toml_dict, "intents", "base")
+    intents_exclude: list[str] = get_attr(toml_dict, "intents", "exclude")
+    max_messages: int = get_attr(toml_dict, "cache", "max_messages")
+    member_cache_flags: str | list[str] = get_attr(toml_dict, "cache", "member_cache_flags")
+    chunk_guilds_at_startup: bool = get_attr(toml_dict, "cache", "chunk_guilds_at_startup")
+    message_store_mb: int = get_attr(toml_dict, "cache", "message_store_mb")
+    message_cache_ttl: int = get_attr(toml_dict, "cache", "message_cache_ttl")
+    message_cache_size: int = get_attr(toml_dict, "cache", "message_cache_size")
 
     extensions: list[str] = get_attr(toml_dict, "extensions", "extensions")
+    import_workers: int = get_attr(toml_dict, "extensions", "import_workers")
 
     # database
     db_string: str = get_attr(toml_dict, "database", "db_string")
+    db_pool_size: int = get_attr(toml_dict, "database", "pool_size")
+    db_max_overflow: int = get_attr(toml_dict, "database", "max_overflow")
+    db_pool_timeout: float = get_attr(toml_dict, "database", "pool_timeout")
+    db_pool_pre_ping: bool = get_attr(toml_dict, "database", "pool_pre_ping")
+    db_pool_recycle: int = get_attr(toml_dict, "database", "pool_recycle")
+    db_statement_cache_size: int = get_attr(toml_dict, "database", "statement_cache_size")
+    guild_cache_ttl: int = get_attr(toml_dict, "database", "guild_cache_ttl")
+    attachment_cache_size: int = get_attr(toml_dict, "database", "attachment_cache_size")
+    playlist_cache_ttl: int = get_attr(toml_dict, "database", "playlist_cache_ttl")
+    playlist_cache_size: int = get_attr(toml_dict, "database", "playlist_cache_size")
+    query_stats: bool = get_attr(toml_dict, "database", "query_stats")
+    slow_query_ms: float = get_attr(toml_dict, "database", "slow_query_ms")
+    slow_query_log: str = get_attr(toml_dict, "database", "slow_query_log")
+
+    # Guild logs
+    logger_queue_size: int = get_attr(toml_dict, "logger", "queue_size")
+    logger_overflow_policy: str = get_attr(toml_dict, "logger", "overflow_policy")
+    logger_block_timeout: float = get_attr(toml_dict, "logger", "block_timeout")
+    logger_batch_size: int = get_attr(toml_dict, "logger", "batch_size")
+    logger_max_open_files: int = get_attr(toml_dict, "logger", "max_open_files")
+    logger_compress_level: int = get_attr(toml_dict, "logger", "compress_level")
+    logger_retention_size_mb: int = get_attr(toml_dict, "logger", "retention_size_mb")
 
     # Special channel IDs
     bot_dev_channel: int = get_attr(toml_dict, "channels", "bot_dev_channel")
@@ -55,10 +95,17 @@ class Config:
 
     allowed_channels: list[int] = eval_channels(toml_dict, get_attr(toml_dict, "channels", "allowed_channels"))
 
+    # Lavalink
+    lavalink_nodes: list[dict] = get_attr(toml_dict, "lavalink", "nodes")
+    lavalink_stats_interval: int = get_attr(toml_dict, "lavalink", "stats_interval")
+
     # Memes
     jany: int = get_attr(toml_dict, "memes", "jany")
     ilbinek: int = get_attr(toml_dict, "memes", "ilbinek")
 
+    # Bookmark
+    bookmark_download_concurrency: int = get_attr(toml_dict, "bookmark", "download_concurrency")
+
     # Weather
     weather_token: str = get_attr(toml_dict, "weather", "token")
 
@@ -2,7 +2,7 @@
 To automatically create table, import the class
 """
 
-from database.guild import GuildDB, GuildPhraseDB
+from database.guild import AttachmentBlobDB, GuildDB, GuildPhraseDB
 from database.voice import PlaylistDB
 
-__all__ = ["GuildDB", "GuildPhraseDB", "PlaylistDB"]
+__all__ = ["AttachmentBlobDB", "GuildDB", "GuildPhraseDB", "PlaylistDB"]
@@ -1,20 +1,216 @@
+import inspect
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import event, exc
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from config.app_config import config
+from database.instrumentation import instrument, track_model_method
 
 
 class Base(DeclarativeBase):
-    pass
+    def __init_subclass__(cls, **kwargs):
+        # statements in query stats are attributed to the model method which executed them
+        for name, attr in list(vars(cls).items()):
+            if isinstance(attr, classmethod) and inspect.iscoroutinefunction(attr.__func__):
+                setattr(cls, name, classmethod(track_model_method(f"{cls.__name__}.{name}", attr.__func__)))
+        super().__init_subclass__(**kwargs)
+
+
+class PoolMetrics:
+    """Counters of connection pool usage, shared by all pools created by the engine"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_wait(self, wait: float):
+        self.waits += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.waits if self.waits else 0.0
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool which measures how long checkouts wait for a free connection.
+
+    The wait ends at the checkout event, before the pre-ping, so a slow ping doesn't look
+    like an exhausted pool. Checkouts which open a new connection are counted as connects.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+
+        pool_metrics.checkouts += 1
+        checked_out = connection.info.pop("checked_out", None)
+        if connection.info.pop("new_connection", False):
+            pool_metrics.connects += 1
+        elif checked_out is not None:
+            pool_metrics.record_wait(checked_out - start)
+        if self.overflow() > 0:
+            pool_metrics.overflow_events += 1
+        return connection
+
+
+def mark_new_connection(dbapi_connection, connection_record):
+    connection_record.info["new_connection"] = True
+
+
+def mark_checked_out(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out"] = time.perf_counter()
+
+
+def ping_connection(dbapi_connection, connection_record, connection_proxy):
+    """`pool_pre_ping` of the measured pool, runs after the checkout is timed"""
+    if connection_record.info.get("new_connection"):
+        return
+    try:
+        database.engine.dialect.do_ping(dbapi_connection)
+    except Exception as e:
+        # pool replaces the connection and checks it out again
+        raise exc.DisconnectionError() from e
+
+
+def engine_options(db_string: str) -> dict:
+    if db_string.startswith("sqlite"):
+        # SQLite has no server connections, SQLAlchemy picks the right pool for file or memory database
+        return {}
+
+    options = {
+        "poolclass": MeasuredQueuePool,
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        # measured pool pings connections itself, see `ping_connection`
+        "pool_pre_ping": False,
+        "pool_recycle": config.db_pool_recycle,
+    }
+    if db_string.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"statement_cache_size": config.db_statement_cache_size}
+    return options
+
+
+# session of the running unit of work, model methods called inside it share the session and transaction
+current_session: ContextVar[AsyncSession | None] = ContextVar("current_session", default=None)
+
+
+class UnitOfWorkSession(AsyncSession):
+    """Session whose commit only flushes while a unit of work shares it, the unit commits once at its end"""
+
+    async def commit(self) -> None:
+        if self.info.get("unit_of_work"):
+            await self.flush()
+        else:
+            await super().commit()
+
+
+def dialect_insert(table):
+    """Insert statement of the current dialect, supports `on_conflict_do_nothing`"""
+    if database.engine.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
 
 
 class Database:
     def __init__(self):
-        self.engine = create_async_engine(config.db_string, echo=False)
-        self.session = sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.connect(config.db_string)
+
+    def connect(self, db_string: str) -> None:
+        """Create engine for `db_string`, tools like benchmarks use it to run models on another database"""
+        self.engine = create_async_engine(db_string, echo=False, **engine_options(db_string))
+        self.session = sessionmaker(self.engine, expire_on_commit=False, class_=UnitOfWorkSession)
+        if isinstance(self.engine.pool, MeasuredQueuePool):
+            event.listen(self.engine.sync_engine, "connect", mark_new_connection)
+            event.listen(self.engine.sync_engine, "checkout", mark_checked_out)
+            if config.db_pool_pre_ping:
+                event.listen(self.engine.sync_engine, "checkout", ping_connection)
+        if config.query_stats:
+            instrument(self.engine.sync_engine)
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """Session of the running unit of work, or a new session closed at the end of the block"""
+        session = current_session.get()
+        if session is not None:
+            yield session
+            return
+
+        async with self.session() as session:
+            yield session
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[AsyncSession]:
+        """Share one session, connection and transaction by all model methods called inside the block.
+
+        Commits of the model methods only flush, changes are committed at the end of the block
+        and rolled back if it raises. Nested units join the outer one.
+        """
+        if current_session.get() is not None:
+            async with self.get_session() as session:
+                yield session
+            return
+
+        async with self.session() as session:
+            session.info["unit_of_work"] = True
+            token = current_session.set(session)
+            try:
+                yield session
+                session.info["unit_of_work"] = False
+                await session.commit()
+            except BaseException:
+                await session.rollback()
+                raise
+            finally:
+                current_session.reset(token)
+
+        for callback in session.info.pop("after_commit", []):
+            callback()
+
+    def after_commit(self, session: AsyncSession, callback: Callable[[], None]) -> None:
+        """Run callback once changes of the session are committed, e.g. to invalidate caches"""
+        if session.info.get("unit_of_work"):
+            session.info.setdefault("after_commit", []).append(callback)
+        else:
+            callback()
 
-    def get_session(self) -> AsyncSession:
-        return self.session()
+    def pool_status(self) -> dict:
+        pool = self.engine.pool
+        # other pools (e.g. single connection of SQLite memory database) don't track usage
+        queue_pool = isinstance(pool, QueuePool)
+        return {
+            "size": pool.size() if queue_pool else 0,
+            "in_use": pool.checkedout() if queue_pool else 0,
+            "idle": pool.checkedin() if queue_pool else 0,
+            "overflow": max(pool.overflow(), 0) if queue_pool else 0,
+            "checkouts": pool_metrics.checkouts,
+            "connects": pool_metrics.connects,
+            "wait_avg_ms": pool_metrics.wait_avg * 1000,
+            "wait_max_ms": pool_metrics.wait_max * 1000,
+            "overflow_events": pool_metrics.overflow_events,
+            "timeouts": pool_metrics.timeouts,
+        }
 
 
 database = Database()
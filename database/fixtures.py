@@ -0,0 +1,88 @@
+"""
+Seeded databases for benchmarks and local experiments without a running Postgres.
+"""
+
+from __future__ import annotations
+
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# this is to import all models so that their tables are created
+from database import *  # noqa
+from database.database import Base, database
+from database.guild import AttachmentBlobDB, GuildDB, GuildPhraseDB
+from database.voice import PlaylistDB
+from utils.general import split_to_parts
+
+MEMORY_DB_STRING = "sqlite+aiosqlite://"
+
+SEED_CHUNK_SIZE = 1000
+
+
+async def seed(conn: AsyncConnection, guilds: int, phrases: int, playlists: int, random_seed: int = 0) -> None:
+    """Insert synthetic guilds with phrases and playlists, empty database is expected.
+
+    Every tenth phrase has attachment, all of them share one of a few blobs.
+    """
+    rng = random.Random(random_seed)
+    blobs = [f"attachment {blob}".encode() for blob in range(10)]
+    blob_rows = [{"hash": AttachmentBlobDB.create_hash(data), "data": data, "size": len(data)} for data in blobs]
+    guild_rows = [{"id": str(guild_id)} for guild_id in range(guilds)]
+    phrase_rows = [
+        {
+            "guild_id": str(guild_id),
+            "key": f"phrase-{guild_id}-{phrase}",
+            "hash_key": GuildPhraseDB.create_hash_key(f"phrase-{guild_id}-{phrase}"),
+            "value": "value",
+            "attachment_hash": rng.choice(blob_rows)["hash"] if phrase % 10 == 0 else None,
+            "attachment_filename": "attachment.txt" if phrase % 10 == 0 else None,
+            "specific_users_id": [str(rng.randrange(guilds * 10))] if phrase % 5 == 0 else None,
+        }
+        for guild_id in range(guilds)
+        for phrase in range(phrases)
+    ]
+    playlist_rows = [
+        {
+            # every fourth playlist is global
+            "guild_id": str(rng.randrange(guilds)) if playlist % 4 else None,
+            "author_id": str(rng.randrange(guilds * 10)),
+            "name": f"playlist-{playlist}",
+            "url": f"https://example.com/{playlist}",
+        }
+        for playlist in range(playlists)
+    ]
+    tables = (
+        (AttachmentBlobDB, blob_rows),
+        (GuildDB, guild_rows),
+        (GuildPhraseDB, phrase_rows),
+        (PlaylistDB, playlist_rows),
+    )
+    for table, rows in tables:
+        for chunk in split_to_parts(rows, SEED_CHUNK_SIZE):
+            await conn.execute(insert(table), chunk)
+
+
+@asynccontextmanager
+async def seeded_database(
+    db_string: str = MEMORY_DB_STRING, guilds: int = 100, phrases: int = 10, playlists: int = 1000
+) -> AsyncIterator[None]:
+    """Point the models to `db_string` with created tables and synthetic data.
+
+    Memory SQLite database by default, it lives only inside the block. Empty
+    databases are seeded, databases with guilds are used as they are.
+    """
+    previous_engine, previous_session = database.engine, database.session
+    database.connect(db_string)
+    try:
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            if not await conn.scalar(GuildDB.__table__.select().limit(1)):
+                await seed(conn, guilds, phrases, playlists)
+        yield
+    finally:
+        await database.engine.dispose()
+        database.engine, database.session = previous_engine, previous_session
@@ -2,11 +2,24 @@ from __future__ import annotations
 
 import hashlib
 
-from sqlalchemy import ARRAY, ForeignKey, LargeBinary, String, UniqueConstraint, select
+from sqlalchemy import ForeignKey, Index, LargeBinary, String, UniqueConstraint, delete, select, text, update
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, lazyload, mapped_column, relationship
 
-from database.database import Base, database
+from config.app_config import config
+from database.database import Base, database, dialect_insert
+from database.types import StringArray
+from utils.cache import MISSING, TTLCache
+from utils.general import split_to_parts
+
+# guild id -> info channel id, member joins would otherwise query the guild every time
+guild_settings_cache = TTLCache(ttl=config.guild_cache_ttl)
+
+# attachment hash -> bytes of recently sent phrase attachments
+attachment_cache = TTLCache(ttl=None, maxsize=config.attachment_cache_size)
+
+# keeps bulk statements under the bind parameter limit of the database
+BULK_CHUNK_SIZE = 1000
 
 
 class GuildDB(Base):
@@ -34,13 +47,47 @@ class GuildDB(Base):
             session.add(guild)
             await session.commit()
             await session.refresh(guild)
+            database.after_commit(session, lambda: guild_settings_cache.invalidate(str(guild_id)))
             return guild
 
-    async def set_info_channel(self, channel_id: str):
+    @classmethod
+    async def add_missing_guilds(cls, guild_ids: list[str]) -> None:
+        """Insert all guilds that are not in database yet, existing guilds are left untouched"""
         async with database.get_session() as session:
-            self.info_channel_id = channel_id
+            for chunk in split_to_parts(guild_ids, BULK_CHUNK_SIZE):
+                statement = dialect_insert(cls).values([{"id": guild_id} for guild_id in chunk])
+                await session.execute(statement.on_conflict_do_nothing(index_elements=[cls.id]))
             await session.commit()
 
+            def invalidate():
+                for guild_id in guild_ids:
+                    guild_settings_cache.invalidate(guild_id)
+
+            database.after_commit(session, invalidate)
+
+    @classmethod
+    async def get_phrases_by_guilds(cls, guild_ids: list[str]) -> dict[str, dict[str, GuildPhraseDB]]:
+        """Phrases of all given guilds loaded at once, guilds without phrases map to empty dict"""
+        phrases = {guild_id: {} for guild_id in guild_ids}
+        async with database.get_session() as session:
+            for chunk in split_to_parts(guild_ids, BULK_CHUNK_SIZE):
+                # don't load the guild back, its selectin would load all phrases again
+                result = await session.scalars(
+                    select(GuildPhraseDB)
+                    .where(GuildPhraseDB.guild_id.in_(chunk))
+                    .options(lazyload(GuildPhraseDB.guild))
+                )
+                for phrase in result:
+                    phrases[phrase.guild_id][phrase.key.lower()] = phrase
+        return phrases
+
+    @classmethod
+    async def set_info_channel(cls, guild_id: str, channel_id: str):
+        async with database.get_session() as session:
+            await session.execute(update(cls).where(cls.id == str(guild_id)).values(info_channel_id=str(channel_id)))
+            await session.commit()
+            database.after_commit(session, lambda: guild_settings_cache.invalidate(str(guild_id)))
+
     @classmethod
     async def get_phrases(cls, guild_id: str) -> dict[str, GuildPhraseDB] | None:
         async with database.get_session() as session:
@@ -51,27 +98,43 @@ class GuildDB(Base):
 
     @classmethod
     async def get_info_channel(cls, guild_id: str) -> str | None:
+        guild_id = str(guild_id)
+        info_channel = guild_settings_cache.get(guild_id)
+        if info_channel is not MISSING:
+            return info_channel
+
         async with database.get_session() as session:
-            guild = await session.execute(select(cls).where(cls.id == guild_id)).scalar_one_or_none()
-            if guild:
-                info_channel = guild.info_channel_id if guild.info_channel_id else None
-                return info_channel
+            info_channel = await session.scalar(select(cls.info_channel_id).where(cls.id == guild_id))
+            info_channel = info_channel or None
+            guild_settings_cache.set(guild_id, info_channel)
+            return info_channel
 
 
 class GuildPhraseDB(Base):
     __tablename__ = "guild_phrase"
 
-    # unique key per guild
-    __table_args__ = (UniqueConstraint("guild_id", "hash_key"),)
+    __table_args__ = (
+        # unique key per guild
+        UniqueConstraint("guild_id", "hash_key"),
+        # get_phrase and loading phrases of guilds
+        Index("ix_guild_phrase_guild_id_key", "guild_id", "key"),
+        # only few phrases have attachment, lookup of phrases using a blob
+        Index(
+            "ix_guild_phrase_attachment_hash",
+            "attachment_hash",
+            postgresql_where=text("attachment_hash IS NOT NULL"),
+            sqlite_where=text("attachment_hash IS NOT NULL"),
+        ),
+    )
 
     hash_key: Mapped[str] = mapped_column(primary_key=True)
     key: Mapped[str] = mapped_column(nullable=False)
     guild_id: Mapped[str] = mapped_column(ForeignKey("guild.id"), nullable=False)
     guild: Mapped[GuildDB] = relationship(back_populates="phrases", lazy="selectin")
     value: Mapped[str] = mapped_column(nullable=False)
-    attachment_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, default=None)
+    attachment_hash: Mapped[str | None] = mapped_column(ForeignKey("attachment_blob.hash"), nullable=True, default=None)
     attachment_filename: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
-    specific_users_id: Mapped[set[str] | None] = mapped_column(ARRAY(String), nullable=True, default=None)
+    specific_users_id: Mapped[set[str] | None] = mapped_column(StringArray, nullable=True, default=None)
 
     @classmethod
     def create_hash_key(cls, key) -> str:
@@ -94,18 +157,20 @@ class GuildPhraseDB(Base):
         attachment_filename: str | None = None,
         specific_users_id: set[str] | None = None,
     ) -> GuildPhraseDB | None:
-        phrase = await cls.get_phrase(guild_id, key)
-        if phrase:
-            return None
+        # lookup and inserts share one transaction, unique constraint stops concurrent insert of the same key
+        async with database.unit_of_work() as session:
+            phrase = await cls.get_phrase(guild_id, key)
+            if phrase:
+                return None
 
-        async with database.get_session() as session:
+            attachment_hash = await AttachmentBlobDB.add_blob(attachment_data) if attachment_data else None
             hash_key = cls.create_hash_key(key)
             phrase = cls(
                 guild_id=guild_id,
                 key=key,
                 hash_key=hash_key,
                 value=value,
-                attachment_data=attachment_data,
+                attachment_hash=attachment_hash,
                 attachment_filename=attachment_filename,
                 specific_users_id=specific_users_id,
             )
@@ -115,11 +180,62 @@ class GuildPhraseDB(Base):
 
     @classmethod
     async def remove_phrase(cls, guild_id: str, key: str) -> GuildPhraseDB | None:
-        phrase = await cls.get_phrase(guild_id, key)
-        if not phrase:
-            return None
+        async with database.unit_of_work() as session:
+            phrase = await cls.get_phrase(guild_id, key)
+            if not phrase:
+                return None
 
-        async with database.get_session() as session:
             await session.delete(phrase)
             await session.commit()
+
+            if phrase.attachment_hash:
+                await AttachmentBlobDB.remove_unused_blob(phrase.attachment_hash)
             return phrase
+
+
+class AttachmentBlobDB(Base):
+    """Attachment bytes of phrases stored once per content hash.
+
+    Phrases keep only the hash, so loading phrases does not load attachments
+    and identical attachments in multiple phrases or guilds are stored once.
+    """
+
+    __tablename__ = "attachment_blob"
+
+    hash: Mapped[str] = mapped_column(primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(nullable=False)
+
+    @classmethod
+    def create_hash(cls, data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    async def add_blob(cls, data: bytes) -> str:
+        """Store data if they are not stored yet and return their hash"""
+        blob_hash = cls.create_hash(data)
+        async with database.get_session() as session:
+            statement = dialect_insert(cls).values(hash=blob_hash, data=data, size=len(data))
+            await session.execute(statement.on_conflict_do_nothing(index_elements=[cls.hash]))
+            await session.commit()
+        return blob_hash
+
+    @classmethod
+    async def get_data(cls, blob_hash: str) -> bytes | None:
+        data = attachment_cache.get(blob_hash)
+        if data is not MISSING:
+            return data
+
+        async with database.get_session() as session:
+            data = await session.scalar(select(cls.data).where(cls.hash == blob_hash))
+            if data is not None:
+                attachment_cache.set(blob_hash, data)
+            return data
+
+    @classmethod
+    async def remove_unused_blob(cls, blob_hash: str) -> None:
+        async with database.get_session() as session:
+            used = select(GuildPhraseDB.hash_key).where(GuildPhraseDB.attachment_hash == blob_hash).exists()
+            await session.execute(delete(cls).where(cls.hash == blob_hash, ~used))
+            await session.commit()
+            database.after_commit(session, lambda: attachment_cache.invalidate(blob_hash))
@@ -2,6 +2,8 @@
 File to initialize/drop the database.
 """
 
+from sqlalchemy import text
+
 # this is to import all models so that they are recognized by Alembic
 from database import *  # noqa
 from database.database import Base, database
@@ -9,5 +11,8 @@ from database.database import Base, database
 
 async def init_db():
     async with database.engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # trigram index of playlist names needs the extension, fresh databases don't have it
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         # await conn.run_sync(database.base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
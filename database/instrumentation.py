@@ -0,0 +1,179 @@
+"""
+Statement timings collected from engine events and the slow query log.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.app_config import config
+
+# upper bounds of latency histogram buckets in milliseconds, the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+# e.g. "GuildDB.get_guild" while a model classmethod runs, its statements are attributed to it
+current_model_method: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_model_method", default=None)
+
+slow_query_logger = logging.getLogger("morpheus.slow_queries")
+
+PLACEHOLDER = r"(?:\$\d+|\?|%\(\w+\)s|:\w+)"
+PLACEHOLDER_LIST = re.compile(rf"\((?:\s*{PLACEHOLDER}\s*,)+\s*{PLACEHOLDER}\s*\)")
+ROW_LIST = re.compile(rf"\((?:\.\.\.|{PLACEHOLDER})\)(?:\s*,\s*\((?:\.\.\.|{PLACEHOLDER})\))+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def track_model_method(name: str, func: Callable) -> Callable:
+    """Wrap coroutine classmethod of a model so statements it executes know their caller"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_model_method.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_model_method.reset(token)
+
+    return wrapper
+
+
+def normalize_statement(statement: str) -> str:
+    """Statements which differ only in the length of IN lists or inserted rows are counted together"""
+    statement = WHITESPACE.sub(" ", statement).strip()
+    statement = PLACEHOLDER_LIST.sub("(...)", statement)
+    return ROW_LIST.sub("(...), ...", statement)
+
+
+def value_shape(value: Any) -> str:
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types and lengths of bound parameters, values are not logged as they contain user data"""
+    if executemany and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {value_shape(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(value_shape(value) for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def returned_rows(cursor) -> int:
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    # async adapters buffer the fetched rows, some drivers don't report rowcount of SELECT
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else 0
+
+
+class StatementStats:
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+        self.callers: Counter[str] = Counter()
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def record(self, elapsed: float, rows: int, caller: str | None) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.rows += rows
+        self.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+        self.callers[caller or "-"] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "avg_ms": self.avg * 1000,
+            "max_ms": self.max * 1000,
+            "rows": self.rows,
+            "histogram_ms": {
+                f"<={bound}" if bound != float("inf") else "inf": count
+                for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)
+            },
+            "callers": dict(self.callers.most_common()),
+        }
+
+
+class QueryStats:
+    """Latency, rows and callers of executed statements, grouped by statement text"""
+
+    def __init__(self):
+        self.statements: dict[str, StatementStats] = {}
+        self.slow_queries = 0
+
+    def record(self, statement: str, elapsed: float, rows: int, caller: str | None) -> None:
+        key = normalize_statement(statement)
+        if key not in self.statements:
+            self.statements[key] = StatementStats(key)
+        self.statements[key].record(elapsed, rows, caller)
+
+    def top(self, count: int = 10) -> list[StatementStats]:
+        """Statements with the highest total time"""
+        return sorted(self.statements.values(), key=lambda stats: stats.total, reverse=True)[:count]
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.slow_queries = 0
+
+
+query_stats = QueryStats()
+
+
+def setup_slow_query_log() -> None:
+    handler = logging.FileHandler(filename=config.slow_query_log, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s: %(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.INFO)
+    slow_query_logger.propagate = False
+
+
+def instrument(engine: Engine) -> None:
+    """Register cursor events measuring every statement executed by the engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        rows = returned_rows(cursor)
+        caller = current_model_method.get()
+        query_stats.record(statement, elapsed, rows, caller)
+
+        if elapsed * 1000 >= config.slow_query_ms:
+            query_stats.slow_queries += 1
+            slow_query_logger.info(
+                f"{elapsed * 1000:.1f} ms, {rows} rows, {caller or '-'}, "
+                f"params {parameter_shape(parameters, executemany)}\n{normalize_statement(statement)}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute is not called for failed statements, SQLAlchemy doesn't fill the cursor of the context
+        if exception_context.connection is not None and exception_context.execution_context is not None:
+            starts = exception_context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
@@ -0,0 +1,66 @@
+"""store phrase attachments by content hash
+
+Revision ID: 3c1f6a2b9d40
+Revises: ee8b8eb9f7fe
+Create Date: 2026-10-17 10:12:41.518204+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1f6a2b9d40"
+down_revision: Union[str, None] = "ee8b8eb9f7fe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attachment_blob",
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.add_column("guild_phrase", sa.Column("attachment_hash", sa.String(), nullable=True))
+    op.create_foreign_key(
+        "guild_phrase_attachment_hash_fkey", "guild_phrase", "attachment_blob", ["attachment_hash"], ["hash"]
+    )
+
+    # move existing attachments, identical attachments are stored only once
+    op.execute(
+        """
+        INSERT INTO attachment_blob (hash, data, size)
+        SELECT DISTINCT ON (encode(sha256(attachment_data), 'hex'))
+            encode(sha256(attachment_data), 'hex'), attachment_data, length(attachment_data)
+        FROM guild_phrase
+        WHERE attachment_data IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE guild_phrase
+        SET attachment_hash = encode(sha256(attachment_data), 'hex')
+        WHERE attachment_data IS NOT NULL
+        """
+    )
+    op.drop_column("guild_phrase", "attachment_data")
+
+
+def downgrade() -> None:
+    op.add_column("guild_phrase", sa.Column("attachment_data", sa.LargeBinary(), nullable=True))
+    op.execute(
+        """
+        UPDATE guild_phrase
+        SET attachment_data = attachment_blob.data
+        FROM attachment_blob
+        WHERE guild_phrase.attachment_hash = attachment_blob.hash
+        """
+    )
+    op.drop_constraint("guild_phrase_attachment_hash_fkey", "guild_phrase", type_="foreignkey")
+    op.drop_column("guild_phrase", "attachment_hash")
+    op.drop_table("attachment_blob")
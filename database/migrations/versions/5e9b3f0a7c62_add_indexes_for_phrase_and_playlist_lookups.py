@@ -0,0 +1,42 @@
+"""add indexes for phrase and playlist lookups
+
+Revision ID: 5e9b3f0a7c62
+Revises: 8a4d2e7c1b95
+Create Date: 2026-10-17 12:40:09.731552+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e9b3f0a7c62"
+down_revision: Union[str, None] = "8a4d2e7c1b95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_guild_phrase_guild_id_key", "guild_phrase", ["guild_id", "key"], unique=False)
+    op.create_index(
+        "ix_guild_phrase_attachment_hash",
+        "guild_phrase",
+        ["attachment_hash"],
+        unique=False,
+        postgresql_where=sa.text("attachment_hash IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_playlist_guild_id_name",
+        "playlist",
+        ["guild_id", "name"],
+        unique=False,
+        postgresql_where=sa.text("guild_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playlist_guild_id_name", table_name="playlist")
+    op.drop_index("ix_guild_phrase_attachment_hash", table_name="guild_phrase")
+    op.drop_index("ix_guild_phrase_guild_id_key", table_name="guild_phrase")
@@ -0,0 +1,34 @@
+"""add playlist name trigram index
+
+Revision ID: 8a4d2e7c1b95
+Revises: 3c1f6a2b9d40
+Create Date: 2026-10-17 11:03:27.204118+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4d2e7c1b95"
+down_revision: Union[str, None] = "3c1f6a2b9d40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_playlist_name_trgm",
+        "playlist",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    # extension is kept, other objects of the database may depend on it
+    op.drop_index("ix_playlist_name_trgm", table_name="playlist", postgresql_using="gin")
@@ -0,0 +1,39 @@
+"""add unique index for global playlists
+
+Revision ID: c6cceadbc07c
+Revises: 5e9b3f0a7c62
+Create Date: 2026-10-17 19:02:51.418307+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6cceadbc07c"
+down_revision: Union[str, None] = "5e9b3f0a7c62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the oldest of global playlists added twice before the index existed
+    op.execute(
+        "DELETE FROM playlist AS duplicate USING playlist AS original "
+        "WHERE duplicate.guild_id IS NULL AND original.guild_id IS NULL "
+        "AND duplicate.name = original.name AND duplicate.author_id = original.author_id "
+        "AND duplicate.id > original.id"
+    )
+    op.create_index(
+        "ix_playlist_global_name_author_id",
+        "playlist",
+        ["name", "author_id"],
+        unique=True,
+        postgresql_where=sa.text("guild_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_playlist_global_name_author_id", table_name="playlist")
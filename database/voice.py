@@ -1,15 +1,88 @@
 from __future__ import annotations
 
-from sqlalchemy import String, UniqueConstraint, select
-from sqlalchemy.orm import Mapped, mapped_column
+from bisect import bisect_left
 
+from sqlalchemy import Index, Select, String, UniqueConstraint, case, func, literal, select, text, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, aliased, mapped_column
+
+from config.app_config import config
 from database.database import Base, database
+from utils.cache import MISSING, TTLCache
+
+# ("author", author id) or ("guild", guild id) -> PlaylistIndex, used by autocomplete on every keystroke
+playlist_index_cache = TTLCache(ttl=config.playlist_cache_ttl, maxsize=config.playlist_cache_size)
+
+# authors and guilds with more playlists are searched by the database instead of cached index
+INDEX_MAX_PLAYLISTS = 500
+
+# maximum number of choices in autocomplete
+SEARCH_LIMIT = 25
+
+
+def like_pattern(query: str) -> str:
+    """Pattern matching `query` anywhere in the string, wildcards in query are matched literally"""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class PlaylistIndex:
+    """Playlists sorted by lowercase name for fast prefix and substring search"""
+
+    def __init__(self, playlists: list[PlaylistDB]):
+        self.playlists = sorted(playlists, key=lambda playlist: playlist.name.lower())
+        self.names = [playlist.name.lower() for playlist in self.playlists]
+
+    def __len__(self) -> int:
+        return len(self.playlists)
+
+    def search(self, query: str, limit: int = 25, exclude_author: str | None = None) -> list[PlaylistDB]:
+        """Playlists whose name starts with `query` followed by those containing it"""
+        query = query.lower()
+        found: list[PlaylistDB] = []
+
+        # prefix matches form a continuous block of the sorted names
+        start = bisect_left(self.names, query)
+        end = start
+        while end < len(self.names) and self.names[end].startswith(query):
+            end += 1
+
+        for index in (*range(start, end), *range(0, start), *range(end, len(self.names))):
+            if len(found) >= limit:
+                break
+            playlist = self.playlists[index]
+            if playlist.author_id == exclude_author:
+                continue
+            if start <= index < end or query in self.names[index]:
+                found.append(playlist)
+        return found
 
 
 class PlaylistDB(Base):
     __tablename__ = "playlist"
 
-    __table_args__ = (UniqueConstraint("name", "author_id", "guild_id"),)
+    __table_args__ = (
+        UniqueConstraint("name", "author_id", "guild_id"),
+        # NULL guild ids are distinct in the constraint above, global playlists need their own index
+        Index(
+            "ix_playlist_global_name_author_id",
+            "name",
+            "author_id",
+            unique=True,
+            postgresql_where=text("guild_id IS NULL"),
+            sqlite_where=text("guild_id IS NULL"),
+        ),
+        # trigram index makes ILIKE '%query%' searches use index (pg_trgm extension)
+        Index("ix_playlist_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # playlists of a guild sorted by name, global playlists have no guild and are never looked up by it
+        Index(
+            "ix_playlist_guild_id_name",
+            "guild_id",
+            "name",
+            postgresql_where=text("guild_id IS NOT NULL"),
+            sqlite_where=text("guild_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -25,26 +98,122 @@ class PlaylistDB(Base):
 
     @classmethod
     async def add_playlist(cls, guild_id: str | None, author_id: str, name: str, url: str) -> PlaylistDB | None:
-        if await cls.get_playlist(guild_id, author_id, name):
+        try:
+            async with database.unit_of_work() as session:
+                if await cls.get_playlist(guild_id, author_id, name):
+                    return None
+
+                playlist = cls(guild_id=guild_id, author_id=author_id, name=name, url=url)
+                session.add(playlist)
+                await session.commit()
+                database.after_commit(session, lambda: cls.invalidate_index(playlist))
+                return playlist
+        except IntegrityError:
+            # concurrent command added the same playlist after the check
             return None
 
-        async with database.get_session() as session:
-            playlist = cls(guild_id=guild_id, author_id=author_id, name=name, url=url)
-            session.add(playlist)
-            await session.commit()
-            return playlist
-
     @classmethod
     async def remove_playlist(cls, inter_author_id: str, playlist_id: int) -> PlaylistDB | None:
-        async with database.get_session() as session:
-            playlist = await cls.get(playlist_id)
-            if inter_author_id != playlist.author_id:
+        async with database.unit_of_work() as session:
+            playlist = await session.get(cls, playlist_id)
+            if not playlist or inter_author_id != playlist.author_id:
                 return None
 
             await session.delete(playlist)
             await session.commit()
+            database.after_commit(session, lambda: cls.invalidate_index(playlist))
             return playlist
 
+    @classmethod
+    def invalidate_index(cls, playlist: PlaylistDB) -> None:
+        playlist_index_cache.invalidate(("author", playlist.author_id))
+        if playlist.guild_id:
+            playlist_index_cache.invalidate(("guild", playlist.guild_id))
+
+    @classmethod
+    async def load_index(cls, key: tuple[str, str], statement: Select) -> PlaylistIndex | None:
+        """Cached index of playlists selected by `statement`, None if there are too many to cache"""
+        index = playlist_index_cache.get(key)
+        if index is MISSING:
+            async with database.get_session() as session:
+                playlists = (await session.scalars(statement.limit(INDEX_MAX_PLAYLISTS + 1))).all()
+            index = PlaylistIndex(playlists) if len(playlists) <= INDEX_MAX_PLAYLISTS else None
+            playlist_index_cache.set(key, index)
+        return index
+
+    @classmethod
+    async def get_author_index(cls, author_id: str) -> PlaylistIndex | None:
+        return await cls.load_index(("author", author_id), select(cls).where(cls.author_id == author_id))
+
+    @classmethod
+    async def get_guild_index(cls, guild_id: str) -> PlaylistIndex | None:
+        return await cls.load_index(("guild", guild_id), select(cls).where(cls.guild_id == guild_id))
+
+    @classmethod
+    async def search_available_playlists(cls, guild_id: str, author_id: str, query: str) -> list[PlaylistDB]:
+        """Author's playlists and playlists of other authors in the guild matching `query`, at most 25"""
+        author_index = await cls.get_author_index(author_id)
+        guild_index = await cls.get_guild_index(guild_id)
+        if author_index is None or guild_index is None:
+            return await cls.search_playlists(guild_id, author_id, query)
+
+        found = author_index.search(query, limit=SEARCH_LIMIT)
+        if len(found) < SEARCH_LIMIT:
+            found += guild_index.search(query, limit=SEARCH_LIMIT - len(found), exclude_author=author_id)
+        return found
+
+    @classmethod
+    async def search_author_playlists(cls, author_id: str, query: str) -> list[PlaylistDB]:
+        """Author's playlists matching `query`, at most 25"""
+        author_index = await cls.get_author_index(author_id)
+        if author_index is not None:
+            return author_index.search(query, limit=SEARCH_LIMIT)
+
+        pattern = like_pattern(query)
+        statement = (
+            select(cls)
+            .where(cls.author_id == author_id, cls.name.ilike(pattern, escape="\\"))
+            .order_by(cls.prefix_order(query), cls.name)
+            .limit(SEARCH_LIMIT)
+        )
+        async with database.get_session() as session:
+            result = await session.scalars(statement)
+            return result.all()
+
+    @classmethod
+    def prefix_order(cls, query: str, name=None):
+        """Sort key placing names starting with `query` first"""
+        name = cls.name if name is None else name
+        return case((func.lower(name).startswith(query.lower(), autoescape=True), 0), else_=1)
+
+    @classmethod
+    def available_playlists_statement(cls, guild_id: str, author_id: str, query: str | None = None) -> Select:
+        """Author's playlists followed by playlists of other authors in the guild in one UNION query"""
+        author_playlists = select(cls, literal(0).label("source")).where(cls.author_id == author_id)
+        guild_playlists = select(cls, literal(1).label("source")).where(
+            cls.author_id != author_id, cls.guild_id == guild_id
+        )
+        if query:
+            pattern = like_pattern(query)
+            author_playlists = author_playlists.where(cls.name.ilike(pattern, escape="\\"))
+            guild_playlists = guild_playlists.where(cls.name.ilike(pattern, escape="\\"))
+
+        # both parts are disjoint by author, so UNION ALL skips the deduplication
+        playlists = union_all(author_playlists, guild_playlists).subquery()
+        playlist = aliased(cls, playlists)
+        order = [playlists.c.source]
+        if query:
+            order.append(cls.prefix_order(query, playlist.name))
+        return select(playlist).order_by(*order, playlist.name)
+
+    @classmethod
+    async def search_playlists(cls, guild_id: str, author_id: str, query: str) -> list[PlaylistDB]:
+        """Available playlists matching `query` searched by the database, at most 25"""
+        statement = cls.available_playlists_statement(guild_id, author_id, query).limit(SEARCH_LIMIT)
+        async with database.get_session() as session:
+            result = await session.scalars(statement)
+            return result.all()
+
     @classmethod
     async def get_playlist(cls, guild_id: str | None, author_id: str, name: str) -> str | None:
         guild_id = None if guild_id == "None" else guild_id
@@ -66,9 +235,9 @@ class PlaylistDB(Base):
 
     @classmethod
     async def get_available_playlists(cls, guild_id: str, author_id: str) -> list[PlaylistDB]:
-        my_playlists = await cls.get_author_playlists(author_id)
-        guild_playlists = await cls.get_playlists_by_author_and_guild(author_id, guild_id)
-        return my_playlists + guild_playlists
+        async with database.get_session() as session:
+            result = await session.scalars(cls.available_playlists_statement(guild_id, author_id))
+            return result.all()
 
     @classmethod
     async def get_playlists_by_author_and_guild(cls, author_id: str, guild_id: str) -> list[PlaylistDB]:
@@ -1,6 +1,10 @@
+import asyncio
+import hashlib
+import json
 import logging
 import os
 import platform
+import time
 
 import aiohttp
 import discord
@@ -11,49 +15,104 @@ from discord.ext import commands
 from config.app_config import config
 from config.messages import GlobalMessages
 from database.init_db import init_db
+from database.instrumentation import setup_slow_query_log
+from utils.constants import LAVALINK_NODE_RETRIES
 from utils.embed import info_embed
 from utils.general import get_commands_count
+from utils.message_cache import message_cache
+from utils.startup import ExtensionLoader, startup_report
 
+BotBase = commands.AutoShardedBot if config.sharding_enabled else commands.Bot
 
-class Morpheus(commands.Bot):
+
+class Morpheus(BotBase):
     def __init__(self) -> None:
-        super().__init__(command_prefix="?", intents=discord.Intents.all())
         self.bot_handler = logging.FileHandler(filename="logs/morpheus.log", encoding="utf-8", mode="w")
         self.bot_formatter = logging.Formatter("%(asctime)s: %(levelname)s: %(message)s")
 
         discord.utils.setup_logging(handler=self.bot_handler, formatter=self.bot_formatter)
+        setup_slow_query_log()
+
+        # cogs are imported before the bot is created, intents are the union of what they declare
+        self.extension_loader = ExtensionLoader(config.extensions, config.import_workers)
+        with startup_report.phase("cog imports"):
+            self.extension_loader.import_all()
+        intents = self.resolve_intents(self.extension_loader.required_intents())
+
+        shard_kwargs = {}
+        if config.sharding_enabled:
+            shard_kwargs["shard_count"] = config.shard_count or None
+            shard_kwargs["shard_ids"] = config.shard_ids or None
+
+        super().__init__(
+            command_prefix="?",
+            intents=intents,
+            max_messages=config.max_messages or None,
+            member_cache_flags=self.resolve_member_cache_flags(intents),
+            chunk_guilds_at_startup=config.chunk_guilds_at_startup,
+            **shard_kwargs,
+        )
+        logging.info(f"Intents: {', '.join(name for name, enabled in intents if enabled)}")
+
+        # resolve once, it doesn't change while the bot is running
+        self.commit_sha = git.Repo(search_parent_directories=True).head.object.hexsha
+        self.command_tree_hashes: dict[str, str] = self.load_command_tree_hashes()
 
     async def setup_hook(self) -> None:
-        # initialize database
-        await init_db()
-        logging.info("Database initialized")
+        start = time.perf_counter()
 
-        # connect to lavalink
-        port = os.environ.get("SERVER_PORT", 2333)
-        password = os.environ.get("LAVALINK_SERVER_PASSWORD", "youshallnotpass")
-        nodes = [wavelink.Node(uri=f"ws://lavalink:{port}", password=password)]
-        await wavelink.Pool.connect(nodes=nodes, client=self, cache_capacity=None)
+        # database, lavalink and bot data don't depend on each other
+        await asyncio.gather(self.init_database(), self.connect_lavalink(), self.fetch_application_info())
 
-        # get bot data
-        await self.application_info()
+        with startup_report.phase("aiohttp session"):
+            headers = {"User-Agent": f"https://github.com/solumath/Morpheus?bot_owner={self.owner_id}"}
+            self.morpheus_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10), headers=headers)
 
-        # create aiohttp session
-        headers = {"User-Agent": f"https://github.com/solumath/Morpheus?bot_owner={self.owner_id}"}
-        self.morpheus_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10), headers=headers)
+        # cogs need the session and database
+        with startup_report.phase("cogs"):
+            await self.init_cogs()
 
-        # load cogs
-        await self.init_cogs()
+        startup_report.setup_time = time.perf_counter() - start
+        startup_report.log()
+
+    async def init_database(self) -> None:
+        with startup_report.phase("database"):
+            await init_db()
+        logging.info("Database initialized")
+
+    async def connect_lavalink(self) -> None:
+        with startup_report.phase("lavalink"):
+            port = os.environ.get("SERVER_PORT", 2333)
+            default_password = os.environ.get("LAVALINK_SERVER_PASSWORD", "youshallnotpass")
+            # single node retries forever, with more nodes a node which is down gives up and its players move
+            default_retries = LAVALINK_NODE_RETRIES if len(config.lavalink_nodes) > 1 else None
+            nodes = [
+                wavelink.Node(
+                    identifier=node.get("identifier") or None,
+                    uri=node.get("uri") or f"ws://lavalink:{port}",
+                    password=node.get("password") or default_password,
+                    retries=node.get("retries", default_retries),
+                )
+                for node in config.lavalink_nodes
+            ]
+            await wavelink.Pool.connect(nodes=nodes, client=self, cache_capacity=None)
+
+    async def fetch_application_info(self) -> None:
+        with startup_report.phase("application info"):
+            await self.application_info()
 
     async def on_ready(self) -> None:
-        synced = await self.tree.sync()
+        synced = await self.sync_command_tree()
         commands = get_commands_count(self)
 
         ready_string = f"Logged in as {self.user.mention} | {self.user.id}\n"
         ready_string += f"Python {platform.python_version()}\n"
         ready_string += f"Discordpy {discord.__version__}\n"
-        ready_string += f"Synced {len(synced)} commands\n"
+        ready_string += f"Synced {synced} commands\n"
         ready_string += f"Latency: {round(self.latency * 1000)} ms\n"
         ready_string += f"Connected to {len(self.guilds)} guilds\n"
+        if self.shard_count:
+            ready_string += f"Running {self.shard_count} shards\n"
         ready_string += GlobalMessages.commands_count(
             sum=commands.get("sum", "Missing"),
             context=commands.get("context", "Missing"),
@@ -63,23 +122,103 @@ class Morpheus(commands.Bot):
         )
 
         embed: discord.Embed = info_embed(self)
-        embed.add_field(name="Synced commands", value=f"{len(synced)}")
+        embed.add_field(name="Synced commands", value=f"{synced}")
 
         # set status for bot
-        repo = git.Repo(search_parent_directories=True)
-        sha = repo.head.object.hexsha
-        await self.change_presence(activity=discord.Game(f"On commit {sha[:7]}"))
+        await self.change_presence(activity=discord.Game(f"On commit {self.commit_sha[:7]}"))
         bot_room: discord.TextChannel = self.get_channel(config.bot_dev_channel)
         if bot_room is not None:
             await bot_room.send(embed=embed)
 
         logging.info(ready_string)
 
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        message_cache.invalidate(payload.message_id)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        message_cache.invalidate(payload.message_id)
+
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:
+        for message_id in payload.message_ids:
+            message_cache.invalidate(message_id)
+
+    @staticmethod
+    def resolve_intents(required: discord.Intents) -> discord.Intents:
+        """Base intents from config together with intents required by cogs, without excluded ones"""
+        if config.intents_all:
+            return discord.Intents.all()
+
+        intents = discord.Intents(**{name: True for name in config.intents_base}) | required
+        for name in config.intents_exclude:
+            setattr(intents, name, False)
+        return intents
+
+    @staticmethod
+    def resolve_member_cache_flags(intents: discord.Intents) -> discord.MemberCacheFlags:
+        if config.member_cache_flags == "auto":
+            return discord.MemberCacheFlags.from_intents(intents)
+        # only the configured flags, default MemberCacheFlags() has every flag enabled
+        flags = discord.MemberCacheFlags.none()
+        for name in config.member_cache_flags:
+            setattr(flags, name, True)
+        if not flags.value:
+            return discord.MemberCacheFlags.from_intents(intents)
+        return flags
+
+    def load_command_tree_hashes(self) -> dict[str, str]:
+        try:
+            with open(config.command_tree_cache, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def command_tree_hash(self, guild: discord.Guild | None = None) -> str:
+        """Hash of the command payloads Discord would receive on sync"""
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        payload.sort(key=lambda command: (command["type"], command["name"]))
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def sync_command_tree(self) -> int:
+        """Syncs global and per guild commands, but only those that changed since the last sync.
+
+        on_ready is dispatched again after every reconnect, so without this every
+        reconnect would send all commands to Discord again.
+
+        Returns number of synced commands.
+        """
+        synced = 0
+        old_hashes = self.command_tree_hashes.copy()
+        tree_hash = self.command_tree_hash()
+        if self.command_tree_hashes.get("global") != tree_hash:
+            synced += len(await self.tree.sync())
+            self.command_tree_hashes["global"] = tree_hash
+
+        for guild in self.guilds:
+            key = str(guild.id)
+            has_commands = bool(self.tree.get_commands(guild=guild))
+            if not has_commands and key not in self.command_tree_hashes:
+                continue
+
+            tree_hash = self.command_tree_hash(guild)
+            if self.command_tree_hashes.get(key) == tree_hash:
+                continue
+
+            synced += len(await self.tree.sync(guild=guild))
+            if has_commands:
+                self.command_tree_hashes[key] = tree_hash
+            else:
+                # commands were removed from the guild, nothing to remember
+                del self.command_tree_hashes[key]
+
+        if self.command_tree_hashes != old_hashes:
+            with open(config.command_tree_cache, "w", encoding="utf-8") as file:
+                json.dump(self.command_tree_hashes, file, indent=4)
+
+        return synced
+
     async def init_cogs(self) -> None:
         """Loads all cogs from the cogs folder"""
-        for cog in config.extensions:
-            await self.load_extension(f"cogs.{cog}")
-            logging.info(f"Loaded {cog}")
+        await self.extension_loader.setup_all(self)
 
 
 morpheus = Morpheus()
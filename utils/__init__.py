@@ -1,9 +1,12 @@
 from . import (
+    cache,
     constants,
     embed,
     general,
     interaction,
+    lazy_import,
+    startup,
     user,
 )
 
-__all__ = ["constants", "embed", "general", "interaction", "user"]
+__all__ = ["cache", "constants", "embed", "general", "interaction", "lazy_import", "startup", "user"]
@@ -1 +1,3 @@
 MAX_FILE_SIZE = 10_000_000  # 10MB
+# reconnect attempts of a Lavalink node when more nodes are configured, then its players move to the others
+LAVALINK_NODE_RETRIES = 5
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import platform
+from collections import Counter
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Iterable
 
@@ -9,6 +10,7 @@ import discord
 from config.messages import GlobalMessages
 
 from .general import get_commands_count
+from .startup import startup_report
 
 if TYPE_CHECKING:
     from morpheus import Morpheus
@@ -22,6 +24,14 @@ def info_embed(bot: Morpheus) -> discord.Embed:
     embed.add_field(name="Latency", value=f"{round(bot.latency * 1000)} ms")
     embed.add_field(name="Guilds", value=len(bot.guilds))
 
+    if isinstance(bot, discord.AutoShardedClient):
+        guilds = Counter(guild.shard_id for guild in bot.guilds)
+        shards = [
+            f"#{shard_id} - {round(latency * 1000)} ms, {guilds[shard_id]} guilds"
+            for shard_id, latency in bot.latencies
+        ]
+        embed.add_field(name="Shards", value="\n".join(shards)[:1024], inline=False)
+
     commands = get_commands_count(bot)
     commands = GlobalMessages.commands_count(
         sum=commands.get("sum", "Missing"),
@@ -31,6 +41,8 @@ def info_embed(bot: Morpheus) -> discord.Embed:
         user=commands.get("user", "Missing"),
     )
     embed.add_field(name="Commands", value=commands, inline=False)
+    if startup_report.cogs:
+        embed.add_field(name="Startup", value=startup_report.summary(), inline=False)
     embed.set_thumbnail(url=bot.user.avatar.url)
     return embed
 
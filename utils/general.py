@@ -68,6 +68,11 @@ def get_local_zone():
     return datetime.now().astimezone().tzinfo
 
 
+def message_jump_url(guild_id: int | None, channel_id: int, message_id: int) -> str:
+    """Jump URL of a message built from IDs, without fetching the message"""
+    return f"https://discord.com/channels/{guild_id or '@me'}/{channel_id}/{message_id}"
+
+
 async def get_or_fetch_channel(bot, channel_id) -> discord.TextChannel:
     channel: discord.TextChannel = bot.get_channel(channel_id)
     if channel is None:
@@ -0,0 +1,52 @@
+"""
+Lazy import of heavy dependencies which are needed only by some commands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+from types import ModuleType
+
+from .startup import startup_report
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access.
+
+    Import time is recorded in the startup report, so it's visible how much
+    the bot saved on boot and what the first command paid instead.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module: ModuleType | None = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self.__name__)
+            elapsed = time.perf_counter() - start
+            startup_report.lazy_imports[self.__name__] = elapsed
+            logging.info(f"Lazy imported {self.__name__} in {elapsed:.3f} s")
+        return self._module
+
+    async def load(self) -> ModuleType:
+        """Import the module in a thread so the first command does not block the event loop."""
+        if self._module is None:
+            await asyncio.to_thread(self._load)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Returns proxy of module `name` which is imported when first used"""
+    return LazyModule(name)
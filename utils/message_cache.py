@@ -0,0 +1,59 @@
+"""
+Messages fetched from the API, shared by all cogs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import discord
+
+from config.app_config import config
+from utils.cache import MISSING, TTLCache
+
+
+class MessageCache:
+    """TTL and LRU cache in front of `fetch_message`.
+
+    Concurrent fetches of the same message wait for one request. Messages are invalidated
+    by raw edit and delete events, a fetch running during the invalidation isn't cached.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        # message id -> running fetch
+        self.pending: dict[int, asyncio.Task] = {}
+
+    async def fetch(self, channel: discord.abc.Messageable, message_id: int) -> discord.Message:
+        message = self.cache.get(message_id)
+        if message is not MISSING:
+            return message
+
+        task = self.pending.get(message_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(channel, message_id))
+            task.add_done_callback(lambda task: self._fetch_done(message_id, task))
+            self.pending[message_id] = task
+        # cancelled caller doesn't cancel the fetch other callers wait for
+        return await asyncio.shield(task)
+
+    async def _fetch(self, channel: discord.abc.Messageable, message_id: int) -> discord.Message:
+        message = await channel.fetch_message(message_id)
+        if self.pending.get(message_id) is asyncio.current_task():
+            self.cache.set(message_id, message)
+        return message
+
+    def _fetch_done(self, message_id: int, task: asyncio.Task) -> None:
+        if self.pending.get(message_id) is task:
+            del self.pending[message_id]
+        # all callers can be cancelled before the fetch fails, retrieve the exception so it isn't
+        # reported as never retrieved and make sure nothing stays cached for the message
+        if not task.cancelled() and task.exception() is not None:
+            self.cache.invalidate(message_id)
+
+    def invalidate(self, message_id: int) -> None:
+        self.cache.invalidate(message_id)
+        self.pending.pop(message_id, None)
+
+
+message_cache = MessageCache(config.message_cache_ttl, config.message_cache_size)
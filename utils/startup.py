@@ -0,0 +1,151 @@
+"""
+Startup timing and concurrent extension loading.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import discord
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from morpheus import Morpheus
+
+# modules shared by almost every cog, imported serially before the cogs so
+# worker threads never race each other on their (partially) initialized state
+SHARED_MODULES = ["discord", "discord.ext.commands", "discord.app_commands", "config.app_config", "cogs.base", "utils"]
+
+
+class CogTiming:
+    def __init__(self, name: str):
+        self.name = name
+        self.import_time: float = 0.0
+        self.setup_time: float = 0.0
+        self.error: str | None = None
+
+    @property
+    def total(self) -> float:
+        return self.import_time + self.setup_time
+
+
+class StartupReport:
+    """Collects timings of the bot startup so they can be logged and shown in embeds."""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.cogs: dict[str, CogTiming] = {}
+        self.lazy_imports: dict[str, float] = {}
+        self.setup_time: float = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Measure wall time of the block as a startup phase.
+
+        Phases running concurrently are measured independently, so their sum
+        can be bigger than `setup_time`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            logging.info(f"Startup phase {name} finished in {self.phases[name]:.3f} s")
+
+    def cog(self, name: str) -> CogTiming:
+        if name not in self.cogs:
+            self.cogs[name] = CogTiming(name)
+        return self.cogs[name]
+
+    def slowest_cogs(self, count: int = 3) -> list[CogTiming]:
+        return sorted(self.cogs.values(), key=lambda timing: timing.total, reverse=True)[:count]
+
+    def as_dict(self) -> dict:
+        return {
+            "setup_time": self.setup_time,
+            "phases": self.phases,
+            "cogs": {
+                name: {"import": timing.import_time, "setup": timing.setup_time, "error": timing.error}
+                for name, timing in self.cogs.items()
+            },
+            "lazy_imports": self.lazy_imports,
+        }
+
+    def summary(self) -> str:
+        """Short human readable summary for embeds"""
+        lines = [f"Started in **{self.setup_time:.2f} s**, cogs loaded in **{self.phases.get('cogs', 0):.2f} s**"]
+        for timing in self.slowest_cogs():
+            lines.append(f"{timing.name} - import {timing.import_time:.2f} s, setup {timing.setup_time:.2f} s")
+        if self.lazy_imports:
+            lazy = ", ".join(f"{name} {elapsed:.2f} s" for name, elapsed in self.lazy_imports.items())
+            lines.append(f"Lazy imports - {lazy}")
+        return "\n".join(lines)
+
+    def log(self) -> None:
+        report = [f"Setup finished in {self.setup_time:.3f} s"]
+        for name, elapsed in self.phases.items():
+            report.append(f"phase {name}: {elapsed:.3f} s")
+        for timing in sorted(self.cogs.values(), key=lambda timing: timing.total, reverse=True):
+            report.append(f"{timing.name}: import {timing.import_time:.3f} s, setup {timing.setup_time:.3f} s")
+        logging.info("\n".join(report))
+
+
+class ExtensionLoader:
+    """Imports extensions concurrently and then runs their setup one by one.
+
+    Importing a module does not need the bot, so the heavy part (cog modules and their
+    dependencies) runs in a thread pool. ``load_extension`` then finds all submodules
+    already in ``sys.modules`` and only executes the package ``__init__`` and ``setup``.
+    Setups stay sequential to keep the order of cogs, listeners and commands deterministic.
+    """
+
+    def __init__(self, extensions: list[str], workers: int = 4):
+        self.extensions = extensions
+        self.workers = max(workers, 1)
+
+    def import_all(self) -> None:
+        for module in SHARED_MODULES:
+            importlib.import_module(module)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cog_import") as executor:
+            list(executor.map(self._import_extension, self.extensions))
+
+    def _import_extension(self, name: str) -> None:
+        timing = startup_report.cog(name)
+        start = time.perf_counter()
+        try:
+            importlib.import_module(f"cogs.{name}")
+        except Exception as e:
+            # load_extension imports the module again and raises the proper error
+            timing.error = repr(e)
+            logging.warning(f"Failed to import {name} in background: {e!r}")
+        timing.import_time = time.perf_counter() - start
+
+    def required_intents(self) -> discord.Intents:
+        """Union of `intents` declared by cogs of the imported extensions"""
+        intents = discord.Intents.none()
+        for name in self.extensions:
+            module = sys.modules.get(f"cogs.{name}")
+            if module is None:
+                continue
+            for obj in vars(module).values():
+                if isinstance(obj, type) and issubclass(obj, commands.Cog):
+                    intents |= getattr(obj, "intents", discord.Intents.none())
+        return intents
+
+    async def setup_all(self, bot: Morpheus) -> None:
+        for name in self.extensions:
+            timing = startup_report.cog(name)
+            start = time.perf_counter()
+            await bot.load_extension(f"cogs.{name}")
+            timing.setup_time = time.perf_counter() - start
+            logging.info(f"Loaded {name}")
+
+
+startup_report = StartupReport()